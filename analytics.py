@@ -7,12 +7,34 @@ In a desktop environment, it's mostly a no-op.
 """
 
 import platform
+import shutil
+import threading
 import time
+import asyncio
+from functools import lru_cache
+from array import array
 import sys
 import os
 from typing import Dict, Any, List, Optional
 import csv
+import io
 import json
+import numpy as np
+
+# Polars is optional; it writes CSV natively and is much faster for long histories.
+# It is slow to import, so it is only loaded by the first export (False once known missing).
+_polars = None
+
+def _get_polars():
+    """Return the polars module, or None if it is not installed."""
+    global _polars
+    if _polars is None:
+        try:
+            import polars
+            _polars = polars
+        except ImportError:
+            _polars = False
+    return _polars or None
 
 # Detect if we're running in a browser environment
 IS_BROWSER = False
@@ -21,8 +43,63 @@ try:
 except:
     pass
 
-# Track events locally if not in browser
-local_events: List[Dict[str, Any]] = []
+# Track events locally if not in browser, stored column-wise so no dict is built per event
+EVENT_FIELDS = ('type', 'screen', 'category', 'action', 'label', 'value', 'timestamp')
+local_events: Dict[str, Any] = {field: [] for field in EVENT_FIELDS}
+local_events['timestamp'] = array('d')
+
+# Flush local events to disk in batches so memory stays bounded during long sessions.
+# Tracking never writes; the game loop checks flush_due() and runs flush_local_events_async().
+FLUSH_EVERY_EVENTS = 1000
+FLUSH_INTERVAL_SECONDS = 60
+MAX_LOCAL_EVENTS = 10_000  # Oldest events are dropped beyond this if no flush runs
+_events_filename: Optional[str] = None  # One file per session, appended to on each flush
+_events_file_lock = threading.Lock()  # Flushes write from worker threads
+
+# Clock for event timestamps and flush timing; events tracked within one frame share the time set by tick()
+_clock = time.time
+_frame_time: Optional[float] = None
+_last_flush_time = _clock()
+
+def set_clock(clock) -> None:
+    """Use a different clock function for event timestamps and flush timing."""
+    global _clock, _last_flush_time
+    _clock = clock
+    _last_flush_time = clock()
+
+def tick(now: Optional[float] = None) -> None:
+    """Start a new frame; events tracked until the next tick reuse this timestamp."""
+    global _frame_time
+    _frame_time = _clock() if now is None else now
+
+def _record_local_event(event_type: str, screen: Optional[str] = None, category: Optional[str] = None,
+                        action: Optional[str] = None, label: Optional[str] = None,
+                        value: Optional[int] = None) -> None:
+    """Append one event to the local event columns."""
+    local_events['type'].append(event_type)
+    local_events['screen'].append(screen)
+    local_events['category'].append(category)
+    local_events['action'].append(action)
+    local_events['label'].append(label)
+    local_events['value'].append(value)
+    now = _frame_time if _frame_time is not None else _clock()
+    local_events['timestamp'].append(now)
+    
+    event_count = local_event_count()
+    if event_count > MAX_LOCAL_EVENTS:
+        # Drop the oldest events rather than growing without bound
+        for column in local_events.values():
+            del column[:event_count - MAX_LOCAL_EVENTS]
+
+def flush_due() -> bool:
+    """Whether enough events or time have built up since the last flush to write them out."""
+    event_count = local_event_count()
+    return event_count > 0 and (event_count >= FLUSH_EVERY_EVENTS
+                                or _clock() - _last_flush_time >= FLUSH_INTERVAL_SECONDS)
+
+def local_event_count() -> int:
+    """Return the number of locally stored events."""
+    return len(local_events['timestamp'])
 
 def track_pageview(screen_name: str) -> None:
     """Track a page view in the analytics system."""
@@ -40,11 +117,7 @@ def track_pageview(screen_name: str) -> None:
             print(f"Analytics error: {e}")
     else:
         # In desktop, just store locally
-        local_events.append({
-            'type': 'pageview',
-            'screen': screen_name,
-            'timestamp': time.time()
-        })
+        _record_local_event('pageview', screen=screen_name)
 
 def track_event(category: str, action: str, label: Optional[str] = None, value: Optional[int] = None) -> None:
     """Track a custom event in the analytics system."""
@@ -69,68 +142,134 @@ def track_event(category: str, action: str, label: Optional[str] = None, value:
             print(f"Analytics error: {e}")
     else:
         # In desktop, just store locally
-        local_events.append({
-            'type': 'event',
-            'category': category,
-            'action': action,
-            'label': label,
-            'value': value,
-            'timestamp': time.time()
-        })
+        _record_local_event('event', category=category, action=action, label=label, value=value)
 
-def inject_analytics_code() -> None:
-    """
-    Inject Google Analytics code into the HTML page.
-    This would be done when building for web.
-    """
-    if IS_BROWSER:
-        try:
-            import javascript
-            
-            # Add Google Analytics tracking code (using a dummy ID here)
-            analytics_code = """
-            <!-- Replace UA-XXXXX-Y with your actual Google Analytics ID -->
-            <script async src="https://www.googletagmanager.com/gtag/js?id=UA-XXXXX-Y"></script>
-            <script>
-              window.dataLayer = window.dataLayer || [];
-              function gtag(){dataLayer.push(arguments);}
-              gtag('js', new Date());
-              gtag('config', 'UA-XXXXX-Y');
-            </script>
-            """
+def _take_local_events() -> Optional[Dict[str, Any]]:
+    """Detach the pending event columns, leaving empty ones for new events (None if there are none)."""
+    global _last_flush_time
+    _last_flush_time = _clock()
+    if IS_BROWSER or not local_event_count():
+        return None
+    
+    pending = {field: local_events[field] for field in EVENT_FIELDS}
+    for field in EVENT_FIELDS:
+        local_events[field] = []
+    local_events['timestamp'] = array('d')
+    return pending
+
+def _write_local_events(pending: Dict[str, Any]) -> None:
+    """Append detached event columns to the session's events file."""
+    global _events_filename
+    event_count = len(pending['timestamp'])
+    try:
+        with _events_file_lock:
+            os.makedirs('analytics', exist_ok=True)
             
-            # This would actually need to be done when building the HTML page
-            # Not at runtime - this is just a placeholder
-            javascript.console.log("Google Analytics code would be injected here in a real deployment")
-        except Exception as e:
-            print(f"Couldn't inject analytics code: {e}")
+            # Write all events in one batch, adding the header only when starting a new file
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            if _events_filename is None:
+                writer.writerow(EVENT_FIELDS)
+            writer.writerows(zip(*(pending[field] for field in EVENT_FIELDS)))
+            filename = _events_filename or f"analytics/events_{int(pending['timestamp'][0])}.csv"
+            with open(filename, 'a', newline='', buffering=1 << 20) as f:
+                f.write(buf.getvalue())
+            _events_filename = filename
+        
+        print(f"Saved {event_count} analytics events to {filename}")
+    except Exception as e:
+        print(f"Error saving analytics data, dropping {event_count} events: {e}")
 
 def save_local_events() -> None:
     """Save locally tracked events to a file (for desktop mode)."""
-    if not IS_BROWSER and local_events:
-        try:
-            os.makedirs('analytics', exist_ok=True)
-            filename = f"analytics/events_{int(time.time())}.txt"
-            
-            with open(filename, 'w') as f:
-                for event in local_events:
-                    f.write(f"{event}\n")
-            
-            print(f"Saved {len(local_events)} analytics events to {filename}")
-            local_events.clear()
-        except Exception as e:
-            print(f"Error saving analytics data: {e}")
+    pending = _take_local_events()
+    if pending is not None:
+        _write_local_events(pending)
+
+async def flush_local_events_async() -> None:
+    """Save locally tracked events from a worker thread so the frame loop does not wait on the write."""
+    pending = _take_local_events()
+    if pending is not None:
+        await asyncio.get_running_loop().run_in_executor(None, _write_local_events, pending)
 
 # Automatically save analytics data when the game exits (in desktop mode)
 if not IS_BROWSER:
     import atexit
     atexit.register(save_local_events)
 
-def format_number(value):
-    """Format numeric values consistently for CSV output."""
-    if isinstance(value, float):
-        return round(value, 2)
-    return value
+# Column layouts of the exported CSV files (money and ratio columns are rounded to 2 decimals).
+# The financial export adds one policies_{line_id} column per line in the history after these.
+FINANCIAL_FIELDS = ('turn', 'cash', 'revenue', 'claims', 'loss_ratio', 'combined_ratio',
+                    'profit', 'investment_value', 'investment_income', 'total_assets')
+MARKET_FIELDS = ('line_id', 'company', 'premium_rate', 'policies', 'market_share', 'advertising', 'turn')
+
+def _write_csv(filepath, fieldnames, rows):
+    """
+    Write rows (tuples in `fieldnames` order) to CSV.
+    
+    Rows may be any iterable, so they can be streamed from a generator.
+    Uses Polars when available, otherwise falls back to the csv module
+    writing through a large file buffer.
+    """
+    pl = _get_polars()
+    if pl is not None:
+        pl.DataFrame(list(rows), schema=list(fieldnames), orient='row', strict=False).write_csv(filepath)
+        return
+    
+    with open(filepath, 'w', newline='', buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(rows)
+
+_REPORT_COLUMNS = ("revenue", "claims_paid", "investment_returns", "operating_expenses", "cash", "investment_value")
+
+def _financial_columns(history):
+    """
+    Return the history's report fields as arrays, plus its policy counts per line.
+    
+    Returns:
+        (columns, line_names, policies) where columns maps each name in _REPORT_COLUMNS
+        to an array with one value per report, and policies is a (reports, len(line_names))
+        array of policy counts, 0 for lines a report does not list
+    """
+    records = getattr(history, "records", None)
+    if records is not None:
+        columns = {field: records[field] for field in _REPORT_COLUMNS}
+        return columns, list(history.line_names), history.policies
+    
+    # A plain list of FinancialReport objects
+    columns = {
+        field: np.array([getattr(report, field) for report in history], dtype=np.float64)
+        for field in _REPORT_COLUMNS
+    }
+    line_names = list(dict.fromkeys(line_id for report in history for line_id in report.policies_by_line))
+    policies = np.array(
+        [[report.policies_by_line.get(line_id, 0) for line_id in line_names] for report in history],
+        dtype=np.int64
+    ).reshape(len(history), len(line_names))
+    return columns, line_names, policies
+
+def _iter_financial_rows(columns, policies):
+    """Yield one row per financial report: the FINANCIAL_FIELDS values, then its policy counts."""
+    revenue, claims, expenses = columns["revenue"], columns["claims_paid"], columns["operating_expenses"]
+    investment_income = columns["investment_returns"]
+    cash, investment_value = columns["cash"], columns["investment_value"]
+    
+    # Compute every derived column for the whole history at once (ratios are 0 for turns without revenue)
+    has_revenue = revenue > 0
+    safe_revenue = np.where(has_revenue, revenue, 1.0)
+    loss_ratio = np.where(has_revenue, claims / safe_revenue, 0.0)
+    combined_ratio = np.where(has_revenue, (claims + expenses) / safe_revenue, 0.0)
+    profit = revenue + investment_income - claims - expenses
+    total_assets = cash + investment_value
+    
+    money_columns = [
+        np.round(column, 2).tolist()
+        for column in (cash, revenue, claims, loss_ratio, combined_ratio, profit,
+                       investment_value, investment_income, total_assets)
+    ]
+    for turn, (values, counts) in enumerate(zip(zip(*money_columns), policies.tolist())):
+        yield (turn, *values, *counts)
 
 def export_financial_data(game_state, filename="game_data.csv"):
     """
@@ -140,49 +279,23 @@ def export_financial_data(game_state, filename="game_data.csv"):
         game_state: The current game state containing financial history
         filename: Name of the CSV file to create
     """
+    if not game_state.financial_history:
+        print("No financial data to export")
+        return None
+    
     # Ensure the analytics directory exists
     os.makedirs('analytics', exist_ok=True)
     
     # Full path for the CSV file
     filepath = os.path.join('analytics', filename)
     
-    # Collect data from financial history
-    data = []
-    
-    # Add header row with turn number
-    for turn, report in enumerate(game_state.financial_history):
-        row = {
-            'turn': turn,
-            'cash': format_number(report.cash),
-            'revenue': format_number(report.premium_revenue),
-            'claims': format_number(report.claims_paid),
-            'loss_ratio': format_number(report.loss_ratio),
-            'combined_ratio': format_number(report.combined_ratio),
-            'profit': format_number(report.net_income),
-            'investment_value': format_number(report.investment_value),
-            'investment_income': format_number(report.investment_income),
-            'total_assets': format_number(report.total_assets)
-        }
-        
-        # Add policy counts for each line
-        for line_id, count in report.policies_by_line.items():
-            row[f'policies_{line_id}'] = count
-            
-        data.append(row)
+    # One policy column per line in the history, then stream rows straight to the writer
+    columns, line_names, policies = _financial_columns(game_state.financial_history)
+    fieldnames = FINANCIAL_FIELDS + tuple(f'policies_{line_id}' for line_id in line_names)
+    _write_csv(filepath, fieldnames, _iter_financial_rows(columns, policies))
     
-    # Write to CSV
-    if data:
-        keys = data[0].keys()
-        with open(filepath, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(data)
-        
-        print(f"Financial data exported to {filepath}")
-        return filepath
-    else:
-        print("No financial data to export")
-        return None
+    print(f"Financial data exported to {filepath}")
+    return filepath
 
 def export_market_data(game_state, filename="market_data.csv"):
     """
@@ -208,57 +321,68 @@ def export_market_data(game_state, filename="market_data.csv"):
             lines.append(f"{state_id}_home")
             lines.append(f"{state_id}_auto")
     
+    # Fetch competitor info for every line up front. get_competitor_info lists the player
+    # first; it is dropped here because the player gets its own row, otherwise the player
+    # would be exported twice and counted twice in every market share total
+    competitor_info_by_line = {
+        line_id: game_state.get_competitor_info(line_id)[1:]
+        for line_id in lines
+    }
+    
+    # Local references to the player's data and per-turn values
+    player = game_state.player_company
+    player_rates = player.premium_rates
+    player_sold = player.policies_sold
+    player_ads = player.advertising_budget
+    current_turn = game_state.current_turn
+    
     # For each line, collect market share and pricing data
     for line_id in lines:
-        # Get competitor info for this line
-        competitor_info = game_state.get_competitor_info(line_id)
+        competitor_info = competitor_info_by_line[line_id]
         
         # Player data
-        player_rate = game_state.player_company.premium_rates.get(line_id, 0)
-        player_policies = game_state.player_company.policies_sold.get(line_id, 0)
-        player_budget = game_state.player_company.advertising_budget.get(line_id, 0)
-        
-        # Calculate total policies in market
-        total_policies = player_policies
-        for comp in competitor_info:
-            total_policies += comp["policies"]
+        player_rate = player_rates.get(line_id, 0)
+        player_policies = player_sold.get(line_id, 0)
+        player_budget = player_ads.get(line_id, 0)
         
-        # Player market share
-        player_share = player_policies / total_policies if total_policies > 0 else 0
+        # Calculate all competitor market shares with one vector divide
+        competitor_policies = np.fromiter(
+            (comp["policies"] for comp in competitor_info), dtype=np.int64, count=len(competitor_info)
+        )
+        total_policies = int(competitor_policies.sum()) + player_policies
+        if total_policies > 0:
+            competitor_shares = (competitor_policies / total_policies).round(2).tolist()
+            player_share = player_policies / total_policies
+        else:
+            competitor_shares = [0.0] * len(competitor_info)
+            player_share = 0
         
         # Add player data
-        row = {
-            'line_id': line_id,
-            'company': game_state.player_company.name,
-            'premium_rate': format_number(player_rate),
-            'policies': player_policies,
-            'market_share': format_number(player_share),
-            'advertising': format_number(player_budget),
-            'turn': game_state.current_turn
-        }
-        data.append(row)
+        data.append((
+            line_id,
+            player.name,
+            round(player_rate, 2),
+            player_policies,
+            round(player_share, 2),
+            round(player_budget, 2),
+            current_turn
+        ))
         
-        # Add competitor data
-        for comp in competitor_info:
-            comp_share = comp["policies"] / total_policies if total_policies > 0 else 0
-            comp_row = {
-                'line_id': line_id,
-                'company': comp["name"],
-                'premium_rate': format_number(comp["rate"]),
-                'policies': comp["policies"],
-                'market_share': format_number(comp_share),
-                'advertising': format_number(comp.get("advertising", 0)),
-                'turn': game_state.current_turn
-            }
-            data.append(comp_row)
+        # Add competitor data (get_competitor_info reports rates under "premium")
+        for comp, comp_share in zip(competitor_info, competitor_shares):
+            data.append((
+                line_id,
+                comp["name"],
+                round(comp["premium"], 2),
+                comp["policies"],
+                comp_share,
+                round(comp.get("advertising", 0), 2),
+                current_turn
+            ))
     
     # Write to CSV
     if data:
-        keys = data[0].keys()
-        with open(filepath, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(data)
+        _write_csv(filepath, MARKET_FIELDS, data)
         
         print(f"Market data exported to {filepath}")
         return filepath
@@ -266,6 +390,23 @@ def export_market_data(game_state, filename="market_data.csv"):
         print("No market data to export")
         return None
 
+# Default install location used before Rscript lookup was configurable
+WINDOWS_RSCRIPT_PATH = r"C:\Program Files\R\R-4.4.1\bin\Rscript.exe"
+
+@lru_cache(maxsize=None)
+def find_rscript() -> Optional[str]:
+    """
+    Locate the Rscript executable, checking RSCRIPT_PATH, then PATH, then the Windows default.
+    
+    The result is cached after the first lookup.
+    """
+    r_exe = os.environ.get("RSCRIPT_PATH") or shutil.which("Rscript")
+    if r_exe:
+        return r_exe
+    if os.path.exists(WINDOWS_RSCRIPT_PATH):
+        return WINDOWS_RSCRIPT_PATH
+    return None
+
 def generate_r_visualization(game_state):
     """
     Generate visualizations using R.
@@ -274,6 +415,11 @@ def generate_r_visualization(game_state):
     Returns:
         Path to the generated visualization file or None if failed
     """
+    r_exe = find_rscript()
+    if not r_exe:
+        print("Rscript not found; install R or set RSCRIPT_PATH to enable visualizations")
+        return None
+    
     # First export the necessary data
     financial_csv = export_financial_data(game_state)
     market_csv = export_market_data(game_state)
@@ -281,118 +427,13 @@ def generate_r_visualization(game_state):
     if not financial_csv or not market_csv:
         return None
     
-    # Create R script file
-    r_script_path = os.path.join('analytics', 'visualize.R')
-    
-    with open(r_script_path, 'w') as f:
-        f.write("""# nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
-# Script to visualize insurance game data
-
-# Load libraries
-library(ggplot2)
-library(dplyr)
-library(reshape2)
-
-# Read data
-financial_data <- read.csv("analytics/game_data.csv")
-market_data <- read.csv("analytics/market_data.csv")
-
-# Output directory
-output_dir <- "analytics/plots"
-dir.create(output_dir, showWarnings = FALSE, recursive = TRUE)
-
-# Function to save plots
-save_plot <- function(plot, filename) {
-  ggsave(file.path(output_dir, filename), plot, width = 8, height = 6)
-}
-
-# 1. Financial Performance Over Time
-financial_plot <- ggplot(financial_data, aes(x = turn)) +
-  geom_line(aes(y = revenue, color = "Revenue"), size = 1) +
-  geom_line(aes(y = claims, color = "Claims"), size = 1) +
-  geom_line(aes(y = profit, color = "Profit"), size = 1) +
-  scale_color_manual(values = c("Revenue" = "blue", "Claims" = "red", "Profit" = "green")) +
-  labs(title = "Financial Performance Over Time",
-       x = "Turn",
-       y = "Amount ($)",
-       color = "Metric") +
-  theme_minimal()
-save_plot(financial_plot, "financial_performance.png")
-
-# 2. Loss Ratio Over Time
-ratio_plot <- ggplot(financial_data, aes(x = turn)) +
-  geom_line(aes(y = loss_ratio, color = "Loss Ratio"), size = 1) +
-  geom_line(aes(y = combined_ratio, color = "Combined Ratio"), size = 1) +
-  geom_hline(yintercept = 1, linetype = "dashed", color = "red", alpha = 0.5) +
-  scale_color_manual(values = c("Loss Ratio" = "purple", "Combined Ratio" = "orange")) +
-  labs(title = "Underwriting Ratios",
-       subtitle = "Values below 1.0 indicate profitability",
-       x = "Turn",
-       y = "Ratio",
-       color = "Metric") +
-  theme_minimal()
-save_plot(ratio_plot, "underwriting_ratios.png")
-
-# 3. Market Share by Line (most recent turn)
-latest_turn <- max(market_data$turn)
-latest_market_data <- market_data %>% filter(turn == latest_turn)
-
-market_share_plot <- ggplot(latest_market_data, aes(x = line_id, y = market_share, fill = company)) +
-  geom_bar(stat = "identity", position = "stack") +
-  coord_flip() +
-  labs(title = "Market Share by Line of Business",
-       subtitle = paste("Turn", latest_turn),
-       x = "Line of Business",
-       y = "Market Share",
-       fill = "Company") +
-  theme_minimal()
-save_plot(market_share_plot, "market_share.png")
-
-# 4. Premium Rate Comparison (most recent turn)
-price_comparison <- ggplot(latest_market_data, aes(x = line_id, y = premium_rate, fill = company)) +
-  geom_bar(stat = "identity", position = "dodge") +
-  coord_flip() +
-  labs(title = "Premium Rate Comparison",
-       subtitle = paste("Turn", latest_turn),
-       x = "Line of Business",
-       y = "Premium Rate",
-       fill = "Company") +
-  theme_minimal()
-save_plot(price_comparison, "premium_comparison.png")
-
-# 5. Investment Value Over Time
-investment_plot <- ggplot(financial_data, aes(x = turn)) +
-  geom_line(aes(y = investment_value, color = "Investment Value"), size = 1) +
-  geom_line(aes(y = investment_income, color = "Investment Income"), size = 1) +
-  scale_color_manual(values = c("Investment Value" = "darkgreen", "Investment Income" = "darkblue")) +
-  labs(title = "Investment Performance",
-       x = "Turn",
-       y = "Amount ($)",
-       color = "Metric") +
-  theme_minimal()
-save_plot(investment_plot, "investment_performance.png")
-
-# Generate a simple report with key metrics
-cat("Insurance Game Analytics Report\n", 
-    "================================\n",
-    "Generated for turn: ", latest_turn, "\n\n",
-    "Key Metrics:\n",
-    "- Cash on hand: $", format(financial_data$cash[nrow(financial_data)], big.mark = ","), "\n",
-    "- Total assets: $", format(financial_data$total_assets[nrow(financial_data)], big.mark = ","), "\n",
-    "- Current loss ratio: ", financial_data$loss_ratio[nrow(financial_data)], "\n",
-    "- Current combined ratio: ", financial_data$combined_ratio[nrow(financial_data)], "\n\n",
-    "All visualizations saved to: ", normalizePath(output_dir), "\n",
-    file = file.path(output_dir, "report.txt"))
-
-# Return success message
-cat("Visualizations generated successfully in", normalizePath(output_dir), "\n")
-""")
+    # The R script is a static file shipped alongside the exported data
+    r_script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analytics', 'visualize.R')
     
     try:
         # Run the R script
         import subprocess
-        r_exe = r"C:\Program Files\R\R-4.4.1\bin\Rscript.exe"
-        result = subprocess.run([r_exe, r_script_path], 
+        result = subprocess.run([r_exe, '--vanilla', r_script_path], 
                                capture_output=True, text=True, check=True)
         
         # Check if the output directory exists and contains files
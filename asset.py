@@ -1,41 +1,181 @@
+from typing import Optional
 import numpy as np
 
-class Asset:
-    """Represents an investment asset in the game."""
-    def __init__(self, name: str, current_price: float, dividend_yield: float, volatility: float):
-        self.name = name
-        self.current_price = current_price
-        self.dividend_yield = dividend_yield
-        self.volatility = volatility
-        self.price_history = [current_price]  # Initialize price history with current price
-        self.net_trades = 0  # Track net trades (buys - sells) for market pressure
-    
-    def update_price(self) -> None:
-        """Update the asset price based on volatility and market pressure."""
+# Price shocks are drawn from a block of pre-drawn N(0, 1) samples
+_SHOCK_BUFFER_SIZE = 8192
+
+# Price histories grow up to this many samples, then keep only the most recent ones
+MAX_PRICE_HISTORY = 4096
+
+class AssetPool:
+    """Stores the state of many assets in parallel arrays so prices update in one vectorized pass."""
+    def __init__(self, capacity: int = 8, history_capacity: int = 64,
+                 rng: Optional[np.random.Generator] = None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._shock_buf = self.rng.standard_normal(_SHOCK_BUFFER_SIZE)
+        self._shock_idx = 0
+        self.size = 0
+        self.current_price = np.zeros(capacity)
+        self.previous_price = np.zeros(capacity)
+        self.dividend_yield = np.zeros(capacity)
+        self.volatility = np.zeros(capacity)
+        self.net_trades = np.zeros(capacity)  # Net trades (buys - sells) for market pressure
+        self.history = np.zeros((capacity, min(history_capacity, MAX_PRICE_HISTORY)))
+        self.history_length = np.zeros(capacity, dtype=np.int64)
+
+    def add(self, current_price: float, dividend_yield: float, volatility: float) -> int:
+        """Add an asset to the pool and return its index."""
+        if self.size == len(self.current_price):
+            self._grow_assets()
+
+        index = self.size
+        self.current_price[index] = current_price
+        self.previous_price[index] = current_price
+        self.dividend_yield[index] = dividend_yield
+        self.volatility[index] = volatility
+        self.net_trades[index] = 0
+        self.history[index, 0] = current_price  # Initialize price history with current price
+        self.history_length[index] = 1
+        self.size += 1
+        return index
+
+    def update_prices(self, indices: Optional[np.ndarray] = None) -> None:
+        """Update prices of the given assets (all assets by default) based on volatility and market pressure."""
+        if indices is None:
+            indices = np.arange(self.size)
+        price = self.current_price[indices]
+
         # Simple random walk with drift (80% of price movement)
         drift = 0.02 / 4  # 2% annual drift, divided by 4 for quarterly
-        random_shock = np.random.normal(0, self.volatility / 2)  # Divide by 2 for quarterly
-        random_move = self.current_price * (drift + random_shock)
-        
+        random_shock = self._next_shocks(len(indices)) * (self.volatility[indices] / 2)  # Divide by 2 for quarterly
+        random_move = price * (drift + random_shock)
+
         # Market pressure effect (20% of price movement)
         # Normalize net trades to a small percentage effect (-2% to +2%)
-        market_pressure = np.clip(self.net_trades / 1000, -0.02, 0.02)
-        market_move = self.current_price * market_pressure
-        
+        market_pressure = np.clip(self.net_trades[indices] / 1000, -0.02, 0.02)
+        market_move = price * market_pressure
+
         # Combine both effects
-        total_change = (random_move * 0.8) + (market_move * 0.2)
-        self.current_price = max(0.01, self.current_price + total_change)
-        
+        self.previous_price[indices] = price
+        self.current_price[indices] = np.maximum(0.01, price + (random_move * 0.8) + (market_move * 0.2))
+
         # Reset net trades for next period
-        self.net_trades = 0
-        
+        self.net_trades[indices] = 0
+
         # Update price history
-        self.price_history.append(self.current_price)
-    
+        self._record_history(indices)
+
+    def apply_returns(self, returns: np.ndarray, indices: Optional[np.ndarray] = None) -> None:
+        """Multiply the prices of the given assets (all assets by default) by 1 + returns."""
+        if indices is None:
+            indices = np.arange(self.size)
+        self.previous_price[indices] = self.current_price[indices]
+        self.current_price[indices] *= 1 + returns
+        self._record_history(indices)
+
+    def _next_shocks(self, count: int) -> np.ndarray:
+        """Return the next `count` standard normal samples, refilling the buffer when exhausted."""
+        if self._shock_idx + count > len(self._shock_buf):
+            self._shock_buf = self.rng.standard_normal(max(_SHOCK_BUFFER_SIZE, count))
+            self._shock_idx = 0
+        shocks = self._shock_buf[self._shock_idx:self._shock_idx + count]
+        self._shock_idx += count
+        return shocks
+
+    def get_history(self, index: int) -> np.ndarray:
+        """
+        Return the price history of an asset, oldest first, as a read-only array.
+        
+        The array may be a view of the pool's history buffer, which later price updates
+        overwrite once it wraps; copy it to keep the values.
+        """
+        length = self.history_length[index]
+        width = self.history.shape[1]
+        if length <= width:
+            history = self.history[index, :length]
+        else:
+            # The buffer has wrapped; the oldest retained sample sits at the write position
+            start = length % width
+            history = np.concatenate((self.history[index, start:], self.history[index, :start]))
+        history.flags.writeable = False
+        return history
+
+    def _record_history(self, indices: np.ndarray) -> None:
+        """Append the current prices of the given assets to their histories."""
+        width = self.history.shape[1]
+        if width < MAX_PRICE_HISTORY and len(indices) and self.history_length[indices].max() >= width:
+            self._grow_history()
+        # Once the buffer is at its maximum length, new samples overwrite the oldest ones
+        self.history[indices, self.history_length[indices] % self.history.shape[1]] = self.current_price[indices]
+        self.history_length[indices] += 1
+
+    def _grow_assets(self) -> None:
+        """Double the number of asset slots."""
+        capacity = len(self.current_price) * 2
+        for attr in ("current_price", "previous_price", "dividend_yield", "volatility", "net_trades", "history_length"):
+            old = getattr(self, attr)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, attr, new)
+        history = np.zeros((capacity, self.history.shape[1]))
+        history[:self.size] = self.history[:self.size]
+        self.history = history
+
+    def _grow_history(self) -> None:
+        """Double the length of the price history buffer, up to MAX_PRICE_HISTORY."""
+        history = np.zeros((self.history.shape[0], min(self.history.shape[1] * 2, MAX_PRICE_HISTORY)))
+        history[:, :self.history.shape[1]] = self.history
+        self.history = history
+
+class Asset:
+    """Represents an investment asset in the game, backed by a slot in an AssetPool."""
+    __slots__ = ("name", "pool", "index")
+
+    def __init__(self, name: str, current_price: float, dividend_yield: float, volatility: float,
+                 pool: AssetPool):
+        # Assets always join a caller's pool, so they share its seeded generator and its arrays
+        self.name = name
+        self.pool = pool
+        self.index = self.pool.add(current_price, dividend_yield, volatility)
+
+    @property
+    def current_price(self) -> float:
+        return float(self.pool.current_price[self.index])
+
+    @current_price.setter
+    def current_price(self, value: float) -> None:
+        self.pool.current_price[self.index] = value
+
+    @property
+    def previous_price(self) -> float:
+        """Price before the most recent update."""
+        return float(self.pool.previous_price[self.index])
+
+    @property
+    def dividend_yield(self) -> float:
+        return float(self.pool.dividend_yield[self.index])
+
+    @property
+    def volatility(self) -> float:
+        return float(self.pool.volatility[self.index])
+
+    @property
+    def net_trades(self) -> float:
+        return float(self.pool.net_trades[self.index])
+
+    @property
+    def price_history(self) -> np.ndarray:
+        """Copy of the price history, oldest first, unaffected by later price updates."""
+        return self.pool.get_history(self.index).copy()
+
+    def update_price(self) -> None:
+        """Update the asset price based on volatility and market pressure."""
+        self.pool.update_prices(np.array([self.index]))
+
     def get_quarterly_income(self, shares: int) -> float:
         """Calculate quarterly dividend/interest income."""
         return shares * self.current_price * (self.dividend_yield / 4)  # Divide by 4 for quarterly
-    
+
     def record_trade(self, shares: int) -> None:
         """Record a trade for market pressure calculation. Positive for buys, negative for sells."""
-        self.net_trades += shares 
\ No newline at end of file
+        self.pool.net_trades[self.index] += shares
@@ -1,6 +1,7 @@
 # nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
 
 import os
+import re
 import sys
 import shutil
 import webbrowser
@@ -8,6 +9,51 @@ import http.server
 import socketserver
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+def copy_file(src_path, dst_path):
+    """Copy a file and its metadata, using an in-kernel copy where the OS supports it."""
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            shutil.copystat(src_path, dst_path)
+            return
+        except OSError:
+            # Not supported for this filesystem pair, fall back to a regular copy
+            pass
+    
+    shutil.copy2(src_path, dst_path)
+
+# Matches the lines in main.py that get browser logging added after them
+MAIN_PATCH_RE = re.compile(r'(print\("Game initialized successfully!"\))|(except Exception as e:)')
+
+def patch_main(match):
+    """Return the replacement text for a MAIN_PATCH_RE match."""
+    if match.group(1):
+        # Add extra logging to main.py
+        return match.group(1) + '\n    import javascript\n    javascript.console.log("Game initialized in browser!")'
+    # Add error logging for browser
+    return match.group(2) + '\n            import javascript\n            javascript.console.error(f"Error: {str(e)}")'
+
+def copy_python_file(src_path, dst_path):
+    """Copy a Python file, adding browser console logging to main.py."""
+    # Read the file and add logging
+    with open(src_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    # Add console.log and error logging for browser debugging (only main.py is patched)
+    if os.path.basename(src_path) == "main.py":
+        content = MAIN_PATCH_RE.sub(patch_main, content)
+    
+    # Write the modified file
+    with open(dst_path, 'w', encoding='utf-8') as f:
+        f.write(content)
 
 def copy_files_for_debug():
     """Copy main game files to a debug directory with added logging."""
@@ -18,58 +64,34 @@ def copy_files_for_debug():
         shutil.rmtree("debug")
     os.makedirs("debug")
     
-    # Copy all .py files and modify them to add logging
+    # Collect all files in a single pass, adding logging to .py files
+    copy_tasks = []
     for root, dirs, files in os.walk("."):
-        # Skip debug directory, __pycache__ and any other hidden folders
-        if "/." in root or root.startswith("./.") or "/__" in root or "/debug" in root:
-            continue
+        # Skip debug directory, __pycache__ and any other hidden folders (pruned so we never descend into them)
+        dirs[:] = [d for d in dirs if not d.startswith(".") and not d.startswith("__") and d != "debug"]
+        
+        if root == ".":
+            dst_dir = "debug"
+        else:
+            subdir = root[2:]  # Remove ./ from path
+            dst_dir = os.path.join("debug", subdir)
+            os.makedirs(dst_dir, exist_ok=True)
             
         for file in files:
+            src_path = os.path.join(root, file)
+            dst_path = os.path.join(dst_dir, file)
+            
             if file.endswith(".py"):
-                src_path = os.path.join(root, file)
-                if root == ".":
-                    dst_path = os.path.join("debug", file)
-                else:
-                    subdir = root[2:]  # Remove ./ from path
-                    os.makedirs(os.path.join("debug", subdir), exist_ok=True)
-                    dst_path = os.path.join("debug", subdir, file)
-                
-                # Read the file and add logging
-                with open(src_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Add console.log for browser debugging
-                if "main.py" in src_path:
-                    # Add extra logging to main.py
-                    content = content.replace('print("Game initialized successfully!")',
-                                             'print("Game initialized successfully!")\n    import javascript\n    javascript.console.log("Game initialized in browser!")')
-                    
-                    # Add error logging for browser
-                    content = content.replace('except Exception as e:',
-                                             'except Exception as e:\n            import javascript\n            javascript.console.error(f"Error: {str(e)}")')
-                
-                # Write the modified file
-                with open(dst_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                copy_tasks.append((copy_python_file, src_path, dst_path))
+            elif not file.endswith(".pyc"):
+                # Copy non-py files as-is
+                copy_tasks.append((copy_file, src_path, dst_path))
     
-    # Copy non-py files as-is
-    for root, dirs, files in os.walk("."):
-        # Skip debug directory, __pycache__ and any other hidden folders
-        if "/." in root or root.startswith("./.") or "/__" in root or "/debug" in root:
-            continue
-            
-        for file in files:
-            if not file.endswith(".py") and not file.endswith(".pyc"):
-                src_path = os.path.join(root, file)
-                if root == ".":
-                    dst_path = os.path.join("debug", file)
-                else:
-                    subdir = root[2:]  # Remove ./ from path
-                    os.makedirs(os.path.join("debug", subdir), exist_ok=True)
-                    dst_path = os.path.join("debug", subdir, file)
-                
-                # Copy the file
-                shutil.copy2(src_path, dst_path)
+    # Copying is I/O bound, so overlap the file operations across threads
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(task, src_path, dst_path) for task, src_path, dst_path in copy_tasks]
+        for future in futures:
+            future.result()  # Re-raise any copy errors
     
     print("Debug environment created in the 'debug' directory")
 
@@ -52,6 +52,13 @@ if ('serviceWorker' in navigator) {
 </script>
 "@
 $content = $content -replace "</body>", "$serviceWorkerScript`n</body>"
+
+# Add Google Analytics if a measurement ID is configured
+if ($env:GA_MEASUREMENT_ID) {
+    Write-Host "Adding Google Analytics..."
+    $analyticsSnippet = (Get-Content -Path "analytics_snippet.html" -Raw) -replace "GA_MEASUREMENT_ID", $env:GA_MEASUREMENT_ID
+    $content = $content -replace "<head>", "<head>`n$analyticsSnippet"
+}
 Set-Content -Path $indexPath -Value $content
 
 Write-Host "Web build completed successfully! Find your files in the build/web directory." 
\ No newline at end of file
@@ -0,0 +1,84 @@
+import numpy as np
+
+# Numba is optional; without it consumer choices are made with vectorized NumPy calls
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+def _choose_providers_numpy(price_factor, ad_factor, can_win, provider_ids,
+                            price_sensitivity, loyalty, satisfaction, provider, noise):
+    """
+    Let every consumer in a segment choose a company.
+    
+    Args:
+        price_factor, ad_factor: Price and advertising factor per company
+        can_win: Whether each company can win consumers (False for bankrupt companies)
+        provider_ids: Each company's provider index in the segment
+        price_sensitivity, loyalty, satisfaction: Traits per consumer
+        provider: Current provider index per consumer (-1 for none)
+        noise: Random score multiplier per consumer and company, shape (consumers, companies)
+    
+    Returns:
+        (chosen, satisfaction, provider) where chosen is the company column each consumer
+        picked (-1 if no company could win them), followed by the updated satisfaction
+        and provider arrays
+    """
+    n_consumers = len(provider)
+    
+    # Loyalty applies in the column of each consumer's current provider
+    is_provider = provider[:, None] == provider_ids
+    loyalty_factor = np.where(is_provider, (1.0 + loyalty * satisfaction)[:, None], 1.0)
+    
+    # Combined score with a small random variation per consumer and company
+    scores = price_factor ** price_sensitivity[:, None] * loyalty_factor * ad_factor
+    scores *= noise
+    scores[:, ~can_win] = -np.inf
+    
+    chosen = scores.argmax(axis=1)
+    has_choice = scores[np.arange(n_consumers), chosen] > -np.inf
+    
+    # Satisfaction is higher if they stayed (loyalty rewarded), reset with a new provider;
+    # consumers without a valid choice keep their provider and satisfaction
+    new_provider = provider_ids[chosen]
+    stayed = new_provider == provider
+    new_satisfaction = np.where(has_choice, np.where(stayed, np.minimum(satisfaction + 0.1, 1.0), 0.5), satisfaction)
+    return np.where(has_choice, chosen, -1), new_satisfaction, np.where(has_choice, new_provider, provider)
+
+def _choose_providers_loop(price_factor, ad_factor, can_win, provider_ids,
+                           price_sensitivity, loyalty, satisfaction, provider, noise):
+    """Loop version of _choose_providers_numpy for compilation with Numba (consumers run in parallel)."""
+    n_consumers, n_companies = noise.shape
+    chosen = np.empty(n_consumers, dtype=np.int64)
+    new_satisfaction = np.empty_like(satisfaction)
+    new_provider = np.empty_like(provider)
+    for i in prange(n_consumers):
+        best_score = -np.inf
+        best = -1
+        for j in range(n_companies):
+            if can_win[j]:
+                score = price_factor[j] ** price_sensitivity[i]
+                if provider[i] == provider_ids[j]:
+                    score *= 1.0 + loyalty[i] * satisfaction[i]
+                score *= ad_factor[j]
+                score *= noise[i, j]
+                if score > best_score:
+                    best_score = score
+                    best = j
+        
+        chosen[i] = best
+        if best < 0:
+            new_satisfaction[i] = satisfaction[i]
+            new_provider[i] = provider[i]
+        else:
+            new_provider[i] = provider_ids[best]
+            new_satisfaction[i] = min(satisfaction[i] + 0.1, 1.0) if provider_ids[best] == provider[i] else 0.5
+    return chosen, new_satisfaction, new_provider
+
+# Compiled without fastmath: it lets LLVM assume no infinities, which makes the -inf start of
+# the best-score search undefined, and lets it reorder the score product, so near-ties would no
+# longer be guaranteed to pick the same company as the NumPy path
+choose_providers = (
+    njit(cache=True, parallel=True)(_choose_providers_loop) if njit is not None else _choose_providers_numpy
+)
@@ -0,0 +1,58 @@
+import numpy as np
+
+# Numba is optional; without it claims are sampled with vectorized NumPy calls.
+# The kernel takes an np.random.Generator, which compiled code only accepts from Numba 0.56 on.
+_MIN_NUMBA_VERSION = (0, 56)
+try:
+    import numba
+    from numba import njit
+    if tuple(int(part) for part in numba.__version__.split(".")[:2]) < _MIN_NUMBA_VERSION:
+        njit = None
+except ImportError:
+    njit = None
+
+def _sample_claims_numpy(rng, claim_rates, policies, means, sigmas, cat_counts, cat_means):
+    """
+    Sample one quarter of claims for every line.
+    
+    Args:
+        rng: The game's np.random.Generator
+        claim_rates: Quarterly claim frequency per policy, per line
+        policies: Policies sold per line
+        means, sigmas: Lognormal parameters of regular claims per line
+        cat_counts: Number of catastrophe claims per line
+        cat_means: Lognormal mean of catastrophe claims per line
+    
+    Returns:
+        (amounts, claim_counts) where amounts holds each line's regular claims
+        followed by its catastrophe claims, in line order
+    """
+    claim_counts = rng.poisson(claim_rates * policies)
+    
+    # Lognormal parameters for every claim, grouped by line
+    counts = np.column_stack((claim_counts, cat_counts)).ravel()
+    claim_means = np.repeat(np.column_stack((means, cat_means)).ravel(), counts)
+    claim_sigmas = np.repeat(np.column_stack((sigmas, np.full(len(sigmas), 0.5))).ravel(), counts)  # Less variation in catastrophe claims
+    
+    # Amounts stay in float64: rounding float32 samples biases summed claims
+    return rng.lognormal(claim_means, claim_sigmas), claim_counts
+
+def _sample_claims_loop(rng, claim_rates, policies, means, sigmas, cat_counts, cat_means):
+    """Loop version of _sample_claims_numpy for compilation with Numba."""
+    n_lines = len(policies)
+    claim_counts = np.empty(n_lines, dtype=np.int64)
+    for i in range(n_lines):
+        claim_counts[i] = rng.poisson(claim_rates[i] * policies[i])
+    
+    amounts = np.empty(claim_counts.sum() + cat_counts.sum())
+    k = 0
+    for i in range(n_lines):
+        for _ in range(claim_counts[i]):
+            amounts[k] = rng.lognormal(means[i], sigmas[i])
+            k += 1
+        for _ in range(cat_counts[i]):
+            amounts[k] = rng.lognormal(cat_means[i], 0.5)  # Less variation in catastrophe claims
+            k += 1
+    return amounts, claim_counts
+
+sample_claims = njit(cache=True)(_sample_claims_loop) if njit is not None else _sample_claims_numpy
@@ -1,7 +1,8 @@
 # nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
+from data.models.claims import ClaimsLedger
 from data.models.company import Company
 from data.models.ai_competitor import AICompetitor
 from data.models.market_segment import MarketSegment
 from data.models.financial_report import FinancialReport
 
-__all__ = ['Company', 'AICompetitor', 'MarketSegment', 'FinancialReport'] 
\ No newline at end of file
+__all__ = ['ClaimsLedger', 'Company', 'AICompetitor', 'MarketSegment', 'FinancialReport'] 
\ No newline at end of file
@@ -1,5 +1,4 @@
 # nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
-import numpy as np
 from typing import Dict, Any, List
 
 from data.models.company import Company
@@ -88,11 +87,7 @@ class AICompetitor(Company):
             # Gradually adjust rates (max 10% change per turn)
             current_rate = self.premium_rates[line_id]
             max_change = current_rate * 0.1
-            new_rate = np.clip(
-                target_rate,
-                current_rate - max_change,
-                current_rate + max_change
-            )
+            new_rate = min(max(target_rate, current_rate - max_change), current_rate + max_change)
             
             self.premium_rates[line_id] = new_rate
     
@@ -0,0 +1,136 @@
+# nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
+from typing import List, Dict, Any, Union
+import numpy as np
+
+CLAIM_TYPES = ("regular", "catastrophe")
+
+class ClaimsLedger:
+    """
+    Claims history stored as parallel column arrays.
+    
+    Claims are appended in turn order, so the claims of one turn are a
+    contiguous slice of the columns. Iterating yields claim dicts for
+    code that still expects the old list-of-dicts history.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.amounts = np.zeros(capacity)
+        self.turns = np.zeros(capacity, dtype=np.int32)
+        self.lines = np.zeros(capacity, dtype=np.int16)  # Codes into line_names
+        self.types = np.zeros(capacity, dtype=np.uint8)  # Codes into CLAIM_TYPES
+        self.line_names: List[str] = []
+        self._line_codes: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __iter__(self):
+        return iter(self.to_records())
+    
+    def append(self, line_id: str, amounts: np.ndarray, turn: int, claim_type: str = "regular") -> float:
+        """Append claims of one line and type, return their total amount."""
+        count = len(amounts)
+        if count == 0:
+            return 0.0
+        if self.size + count > len(self.amounts):
+            self._grow(self.size + count)
+        
+        line_code = self._line_codes.get(line_id)
+        if line_code is None:
+            line_code = self._line_codes[line_id] = len(self.line_names)
+            self.line_names.append(line_id)
+        
+        end = self.size + count
+        self.amounts[self.size:end] = amounts
+        self.turns[self.size:end] = turn
+        self.lines[self.size:end] = line_code
+        self.types[self.size:end] = CLAIM_TYPES.index(claim_type)
+        self.size = end
+        return float(self.amounts[end - count:end].sum())
+    
+    def reserve(self, count: int) -> None:
+        """Make room for `count` more claims so the next appends don't reallocate."""
+        if self.size + count > len(self.amounts):
+            self._grow(self.size + count)
+    
+    def extend(self, claims: List[Dict[str, Any]]) -> None:
+        """Append claims given as dicts with line, amount, turn and type keys."""
+        for claim in claims:
+            self.append(claim["line"], np.array([claim["amount"]]), claim["turn"], claim.get("type", "regular"))
+    
+    def turn_slice(self, turn: int) -> slice:
+        """Return the slice of the columns holding the claims of `turn`."""
+        turns = self.turns[:self.size]
+        start, end = np.searchsorted(turns, [turn, turn + 1])
+        return slice(int(start), int(end))
+    
+    def turn_total(self, turn: int) -> float:
+        """Total amount of the claims made in `turn`."""
+        return float(self.amounts[self.turn_slice(turn)].sum())
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Return the claims as a list of dicts."""
+        return [
+            {"line": self.line_names[line], "amount": amount, "turn": turn, "type": CLAIM_TYPES[claim_type]}
+            for line, amount, turn, claim_type in zip(
+                self.lines[:self.size].tolist(),
+                self.amounts[:self.size].tolist(),
+                self.turns[:self.size].tolist(),
+                self.types[:self.size].tolist()
+            )
+        ]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the ledger to a dictionary of columns for serialization."""
+        return {
+            "line_names": list(self.line_names),
+            "amounts": self.amounts[:self.size].tolist(),
+            "turns": self.turns[:self.size].tolist(),
+            "lines": self.lines[:self.size].tolist(),
+            "types": self.types[:self.size].tolist()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> 'ClaimsLedger':
+        """
+        Create a ledger from serialized columns or a legacy list of claim dicts.
+        
+        Claims are stably sorted by turn, since older saves did not keep them in turn order
+        and turn_slice relies on it.
+        """
+        if isinstance(data, cls):
+            return data
+        
+        if isinstance(data, list):
+            ledger = cls(capacity=max(1024, len(data)))
+            ledger.extend(sorted(data, key=lambda claim: claim["turn"]))
+            return ledger
+        
+        size = len(data["amounts"])
+        ledger = cls(capacity=max(1024, size))
+        ledger.size = size
+        ledger.amounts[:size] = data["amounts"]
+        ledger.turns[:size] = data["turns"]
+        ledger.lines[:size] = data["lines"]
+        ledger.types[:size] = data["types"]
+        ledger.line_names = list(data["line_names"])
+        ledger._line_codes = {line_id: code for code, line_id in enumerate(ledger.line_names)}
+        
+        turns = ledger.turns[:size]
+        if (turns[1:] < turns[:-1]).any():
+            order = np.argsort(turns, kind="stable")
+            for column in (ledger.amounts, ledger.turns, ledger.lines, ledger.types):
+                column[:size] = column[:size][order]
+        return ledger
+    
+    def _grow(self, min_capacity: int) -> None:
+        """Grow the columns to hold at least `min_capacity` claims, doubling the capacity."""
+        capacity = len(self.amounts)
+        while capacity < min_capacity:
+            capacity *= 2
+        for attr in ("amounts", "turns", "lines", "types"):
+            old = getattr(self, attr)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, attr, new)
@@ -1,6 +1,9 @@
 # nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
 from dataclasses import dataclass
 from typing import List, Dict, Any
+import numpy as np
+
+from data.models.claims import ClaimsLedger
 
 @dataclass
 class Company:
@@ -9,10 +12,13 @@ class Company:
     cash: float
     investments: Dict[str, int]  # Stores number of shares for each asset
     policies_sold: Dict[str, int]
-    claims_history: List[Dict[str, Any]]
+    claims_history: ClaimsLedger  # A list of claim dicts is converted on construction
     premium_rates: Dict[str, float]
     advertising_budget: Dict[str, float]  # Advertising budget per line
     
+    def __post_init__(self):
+        self.claims_history = ClaimsLedger.from_dict(self.claims_history)
+    
     def calculate_revenue(self) -> float:
         """Calculate total revenue from premiums."""
         return sum(self.premium_rates[market] * count 
@@ -25,6 +31,12 @@ class Company:
         self.claims_history.extend(claims)
         return total_claims
     
+    def pay_claims(self, line_id: str, amounts: np.ndarray, turn: int, claim_type: str = "regular") -> float:
+        """Pay an array of claims on one line, return total amount paid."""
+        total_claims = self.claims_history.append(line_id, amounts, turn, claim_type)
+        self.cash -= total_claims
+        return total_claims
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert company object to a dictionary for serialization."""
         return {
@@ -32,7 +44,7 @@ class Company:
             "cash": self.cash,
             "investments": self.investments,
             "policies_sold": self.policies_sold,
-            "claims_history": self.claims_history,
+            "claims_history": self.claims_history.to_dict(),
             "premium_rates": self.premium_rates,
             "advertising_budget": self.advertising_budget
         }
@@ -1,19 +1,34 @@
 # nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
 from dataclasses import dataclass
-from typing import List
-import numpy as np
+import math
 
-@dataclass
+# Numba is optional; without it the demand math runs as plain Python
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def _calc_demand(premium: float, competitor_mean: float, price_sensitivity: float,
+                 market_size: int, current_demand: int) -> int:
+    """Demand at `premium`, falling off exponentially as it rises above the mean market premium."""
+    relative_price = premium / competitor_mean if competitor_mean else 1.0
+    demand_factor = math.exp(-price_sensitivity * (relative_price - 1))
+    return int(min(market_size, current_demand * demand_factor))
+
+if njit is not None:
+    _calc_demand = njit(cache=True, fastmath=True)(_calc_demand)
+
+@dataclass(slots=True)
 class MarketSegment:
     """Represents a market segment with specific risk characteristics."""
+    
     name: str
     base_risk: float
     price_sensitivity: float
     market_size: int
     current_demand: int
     
-    def calculate_demand(self, premium: float, competitor_premiums: List[float]) -> int:
-        """Calculate demand based on premium pricing and competition."""
-        relative_price = premium / np.mean(competitor_premiums) if competitor_premiums else 1.0
-        demand_factor = np.exp(-self.price_sensitivity * (relative_price - 1))
-        return int(min(self.market_size, self.current_demand * demand_factor)) 
\ No newline at end of file
+    def calculate_demand(self, premium: float, competitor_mean: float) -> int:
+        """Calculate demand based on premium pricing relative to the mean market premium."""
+        return _calc_demand(float(premium), float(competitor_mean), float(self.price_sensitivity),
+                            int(self.market_size), int(self.current_demand))
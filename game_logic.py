@@ -1,14 +1,16 @@
 from typing import List, Dict
 import numpy as np
-from models import Company, MarketSegment, FinancialReport, AICompetitor
-from asset import Asset
+from models import Company, MarketSegment, FinancialReport, FinancialHistory, AICompetitor
+from asset import Asset, AssetPool
 from market_dynamics import MarketDynamics
+from claims_kernel import sample_claims
 
 class GameState:
     """Manages the overall game state and progression."""
     
-    def __init__(self, initial_state="CA", company_name="Player Insurance Co."):
+    def __init__(self, initial_state="CA", company_name="Player Insurance Co.", seed=None):
         self.current_turn = 0
+        self.rng = np.random.default_rng(seed)
         self.player_company = Company(
             name=company_name,
             cash=1000000.0,  # Starting with $1M
@@ -26,8 +28,11 @@ class GameState:
             AICompetitor("Conservative Insurance Co.", cash=1000000.0, risk_profile="conservative")
         ]
         
+        # Every company in the game, player first (rows of the company-by-line arrays)
+        self.companies = [self.player_company] + self.ai_competitors
+        
         # Initialize market dynamics
-        self.market = MarketDynamics()
+        self.market = MarketDynamics(rng=self.rng)
         
         # Track which states are unlocked
         self.unlocked_states = {state_id: False for state_id in self.market.states}
@@ -36,47 +41,51 @@ class GameState:
         # Initialize advertising budgets for AI competitors
         for competitor in self.ai_competitors:
             competitor.advertising_budget = {}
-            for state_id in self.market.states:
-                for line in ["home", "auto"]:
-                    line_id = f"{state_id}_{line}"
-                    if competitor.risk_profile == "aggressive":
-                        competitor.advertising_budget[line_id] = 50000  # Spends more on advertising
-                    elif competitor.risk_profile == "conservative":
-                        competitor.advertising_budget[line_id] = 20000  # Spends less on advertising
-                    else:
-                        competitor.advertising_budget[line_id] = 35000  # Balanced spending
-        
-        # Initialize investment assets
+            for line_id in self.market.segment_keys.values():
+                if competitor.risk_profile == "aggressive":
+                    competitor.advertising_budget[line_id] = 50000  # Spends more on advertising
+                elif competitor.risk_profile == "conservative":
+                    competitor.advertising_budget[line_id] = 20000  # Spends less on advertising
+                else:
+                    competitor.advertising_budget[line_id] = 35000  # Balanced spending
+        
+        # Initialize investment assets (prices are stored together in one pool)
+        self.asset_pool = AssetPool(rng=self.rng)
         self.investment_assets = {
             "SP500": Asset(
                 name="S&P 500 ETF",
                 current_price=450.0,
                 dividend_yield=0.015,  # 1.5% dividend yield
-                volatility=0.15  # 15% annual volatility
+                volatility=0.15,  # 15% annual volatility
+                pool=self.asset_pool
             ),
             "CORP_BONDS": Asset(
                 name="Corporate Bond ETF",
                 current_price=100.0,
                 dividend_yield=0.045,  # 4.5% yield
-                volatility=0.08  # 8% annual volatility
+                volatility=0.08,  # 8% annual volatility
+                pool=self.asset_pool
             ),
             "LONG_TREASURY": Asset(
                 name="Long-Term Treasury ETF",
                 current_price=90.0,
                 dividend_yield=0.035,  # 3.5% yield
-                volatility=0.12  # 12% annual volatility
+                volatility=0.12,  # 12% annual volatility
+                pool=self.asset_pool
             ),
             "SHORT_TREASURY": Asset(
                 name="Short-Term Treasury ETF",
                 current_price=50.0,
                 dividend_yield=0.02,  # 2% yield
-                volatility=0.03  # 3% annual volatility
+                volatility=0.03,  # 3% annual volatility
+                pool=self.asset_pool
             ),
             "REIT": Asset(
                 name="Real Estate Investment Trust ETF",
                 current_price=80.0,
                 dividend_yield=0.06,  # 6% dividend yield
-                volatility=0.20  # 20% annual volatility
+                volatility=0.20,  # 20% annual volatility
+                pool=self.asset_pool
             )
         }
         
@@ -86,17 +95,23 @@ class GameState:
         # Get market segments from market dynamics
         self.market_segments = self.market.market_segments
         
+        # Get line lookup tables from market dynamics
+        self.line_to_state = self.market.line_to_state
+        self.line_is_home = self.market.line_is_home
+        
         # Get base market rates from market dynamics
         self.base_market_rates = self.market.base_market_rates
         
         # Get claim distributions from market dynamics
-        self.claim_distributions = {}
-        for state_id, state_info in self.states.items():
-            for line in ["home", "auto"]:
-                line_id = f"{state_id}_{line}"
-                self.claim_distributions[line_id] = self.market.get_claim_distribution(line_id)
+        self.claim_distributions = self.market.claim_distributions
+        
+        # Claim parameters as arrays in line ordinal order (quarterly frequency is a quarter of the annual risk)
+        self._claim_rates = np.array([self.market_segments[line_id].base_risk / 4 for line_id in self.market.line_names])
+        self._claim_means = self.market.claim_mean_array
+        self._claim_sigmas = self.market.claim_sigma_array
+        self._cat_means = self.market.cat_mean_array
         
-        self.financial_history: List[FinancialReport] = []
+        self.financial_history = FinancialHistory()
     
     def unlock_state(self, state_id: str) -> bool:
         """Attempt to unlock a new state. Returns True if successful."""
@@ -118,42 +133,38 @@ class GameState:
             competitor.make_decisions(self)
         
         # Collect all advertising budgets
-        advertising_budgets = {
-            self.player_company.name: self.player_company.advertising_budget
-        }
-        for competitor in self.ai_competitors:
-            advertising_budgets[competitor.name] = competitor.advertising_budget
+        advertising_budgets = {company.name: company.advertising_budget for company in self.companies}
         
-        # Update market with new consumer model
-        self.market.update_market(self.player_company, self.ai_competitors, advertising_budgets)
+        # Update market with new consumer model (policies come back as a company-by-line array)
+        policies = self.market.update_market(self.player_company, self.ai_competitors, advertising_budgets)
         
-        self._generate_claims()
-        self._calculate_investment_returns()
-        self._generate_financial_report()
+        # Market-wide draws for the turn: catastrophes per state, then asset prices
+        cat_ratios = self.market.roll_catastrophes()
+        self.asset_pool.update_prices()
         
-        # Deduct advertising costs
+        # Deduct advertising costs (before the reports, so they show end-of-turn cash)
         self._process_advertising_costs()
         
+        # Claims, investment returns and the financial report, one company at a time
+        histories = [self.financial_history] + [competitor.financial_history for competitor in self.ai_competitors]
+        for company, company_policies, history in zip(self.companies, policies, histories):
+            history.append(self._process_company_turn(company, company_policies, cat_ratios))
+        
         self.current_turn += 1
     
     def _process_advertising_costs(self):
         """Process advertising costs for all companies."""
-        # Player company
-        for line_id, budget in self.player_company.advertising_budget.items():
-            self.player_company.cash -= budget
-        
-        # AI competitors
+        # Charge each company its total budget in one subtraction
+        self.player_company.cash -= sum(self.player_company.advertising_budget.values())
         for competitor in self.ai_competitors:
-            for line_id, budget in competitor.advertising_budget.items():
-                competitor.cash -= budget
+            competitor.cash -= sum(competitor.advertising_budget.values())
     
     def set_advertising_budget(self, line_id: str, amount: float) -> bool:
         """Set advertising budget for a specific line. Returns True if successful."""
         if amount < 0:
             return False
         
-        state_id = line_id.split("_")[0]
-        if not self.unlocked_states[state_id]:
+        if not self.unlocked_states[self.line_to_state[line_id]]:
             return False
         
         if amount > self.player_company.cash:
@@ -164,10 +175,7 @@ class GameState:
     
     def get_market_share(self, line_id: str) -> float:
         """Calculate market share for a specific line."""
-        total_policies = sum(
-            comp.policies_sold.get(line_id, 0) 
-            for comp in [self.player_company] + self.ai_competitors
-        )
+        total_policies = sum(company.policies_sold.get(line_id, 0) for company in self.companies)
         
         if total_policies == 0:
             return 0.0
@@ -176,165 +184,108 @@ class GameState:
     
     def get_competitor_info(self, line_id: str) -> List[Dict]:
         """Get competitor information for a specific line."""
+        base_rate = self.market.base_market_rates[line_id]
         info = []
-        for company in [self.player_company] + self.ai_competitors:
+        for company in self.companies:
             info.append({
                 "name": company.name,
-                "premium": company.premium_rates.get(line_id, self.market.base_market_rates[line_id]),
+                "premium": company.premium_rates.get(line_id, base_rate),
                 "policies": company.policies_sold.get(line_id, 0),
                 "advertising": company.advertising_budget.get(line_id, 0)
             })
         return info
     
-    def _generate_claims(self):
-        """Generate insurance claims based on line characteristics and catastrophes."""
-        # Process claims for player company
-        self._process_company_claims(self.player_company)
-        
-        # Process claims for AI competitors
-        for competitor in self.ai_competitors:
-            self._process_company_claims(competitor)
-    
-    def _process_company_claims(self, company):
-        """Process claims for a specific company."""
-        # First, collect premium revenue for the quarter
-        premium_revenue = sum(
-            company.premium_rates.get(line_id, self.base_market_rates[line_id]) * policies
-            for line_id, policies in company.policies_sold.items()
-        ) / 4  # Quarterly revenue
-        
-        # Add premium revenue to cash
+    def _process_company_turn(self, company, policies: np.ndarray, cat_ratios: np.ndarray) -> FinancialReport:
+        """
+        Settle a company's quarter and return its financial report.
+        
+        Args:
+            company: The company to settle
+            policies: The company's policies sold, in line ordinal order
+            cat_ratios: Share of each line's policies hit by this turn's catastrophes
+        """
+        # Collect premium revenue for the quarter
+        premium_revenue = self._compute_quarterly_premium_revenue(company, policies)
         company.cash += premium_revenue
         
-        claims = []
+        claims_paid = self._process_company_claims(company, policies, cat_ratios)
         
-        # Generate regular claims
-        for line_id, policies in company.policies_sold.items():
-            if policies <= 0:
-                continue
-                
-            state_id = line_id.split("_")[0]
-            segment = self.market_segments[line_id]
-            base_risk = segment.base_risk
-            
-            # Calculate quarterly claim frequency (divide annual risk by 4)
-            quarterly_risk = base_risk / 4
-            claim_count = np.random.poisson(quarterly_risk * policies)
-            
-            # Generate regular claims
-            dist = self.claim_distributions[line_id]
-            for _ in range(claim_count):
-                claim_amount = np.random.lognormal(
-                    mean=dist["mean"],
-                    sigma=dist["sigma"]
-                )
-                
-                claims.append({
-                    "line": line_id,
-                    "amount": claim_amount,
-                    "turn": self.current_turn,
-                    "type": "regular"
-                })
-            
-            # Generate catastrophe claims for home insurance
-            if "_home" in line_id:  # Only home insurance has catastrophe risk
-                if self.market.generate_catastrophe(state_id):
-                    # Affect 10-30% of policies in the state
-                    affected_ratio = np.random.uniform(0.1, 0.3)
-                    affected_policies = int(policies * affected_ratio)
-                    
-                    for _ in range(affected_policies):
-                        claim_amount = np.random.lognormal(
-                            mean=dist["cat_mean"],
-                            sigma=0.5  # Less variation in catastrophe claims
-                        )
-                        
-                        claims.append({
-                            "line": line_id,
-                            "amount": claim_amount,
-                            "turn": self.current_turn,
-                            "type": "catastrophe"
-                        })
-        
-        company.process_claims(claims)
-    
-    def _calculate_investment_returns(self):
-        """Calculate returns from investments including dividends/interest and price changes."""
-        total_income = 0
-        unrealized_gains = 0
+        # Add investment income to cash (dividends/interest are realized)
+        investment_income, unrealized_gains = self._company_investment_returns(company)
+        company.cash += investment_income
         
-        # Update asset prices and calculate income
-        for asset_name, asset in self.investment_assets.items():
-            shares = self.player_company.investments.get(asset_name, 0)
-            if shares > 0:
-                # Calculate quarterly income (dividends/interest)
-                income = asset.get_quarterly_income(shares)
-                total_income += income
-                
-                # Update price and calculate unrealized gains
-                old_price = asset.current_price
-                asset.update_price()
-                price_change = asset.current_price - old_price
-                unrealized_gains += price_change * shares
+        return self._generate_company_report(company, policies, premium_revenue, investment_income, unrealized_gains, claims_paid)
+    
+    def _compute_quarterly_premium_revenue(self, company, policies: np.ndarray) -> float:
+        """Calculate a company's premium revenue for the quarter."""
+        # Rates and policies are aligned by line ordinal, so revenue is one dot product
+        rates = company.premium_rate_array(self.market.line_names, self.market.base_rate_array)
+        return float(np.dot(rates, policies)) * 0.25  # Quarterly revenue
+    
+    def _process_company_claims(self, company, policies: np.ndarray, cat_ratios: np.ndarray) -> float:
+        """Generate and pay a company's claims for the quarter, return the total paid."""
+        line_names = self.market.line_names
         
-        # Add income to cash (dividends/interest are realized)
-        self.player_company.cash += total_income
+        # Each affected policy files one catastrophe claim
+        cat_counts = (policies * cat_ratios).astype(np.int64)
         
-        return total_income, unrealized_gains
-    
-    def _generate_financial_report(self):
-        """Generate a financial report for the current turn."""
-        # Generate report for player company
-        self.financial_history.append(self._generate_company_report(self.player_company))
+        amounts, claim_counts = sample_claims(
+            self.rng, self._claim_rates, policies, self._claim_means, self._claim_sigmas, cat_counts, self._cat_means
+        )
         
-        # Generate reports for AI competitors
-        for competitor in self.ai_competitors:
-            competitor.financial_history.append(self._generate_company_report(competitor))
+        # Pay each line's regular claims, then its catastrophe claims, keeping a running total for the report
+        # (lines without any claims, such as lines with no policies, are skipped)
+        ends = np.cumsum(np.column_stack((claim_counts, cat_counts)).ravel()).reshape(-1, 2)
+        company.claims_history.reserve(len(amounts))
+        claims_total = 0.0
+        for i in np.flatnonzero(claim_counts + cat_counts).tolist():
+            line_id = line_names[i]
+            start = ends[i, 0] - claim_counts[i]
+            claims_total += company.pay_claims(line_id, amounts[start:ends[i, 0]], self.current_turn, "regular")
+            claims_total += company.pay_claims(line_id, amounts[ends[i, 0]:ends[i, 1]], self.current_turn, "catastrophe")
+        return claims_total
     
-    def _generate_company_report(self, company):
-        """Generate a financial report for a specific company."""
-        # Calculate revenue from premiums
-        premium_revenue = sum(
-            company.premium_rates.get(line_id, self.base_market_rates[line_id]) * policies
-            for line_id, policies in company.policies_sold.items()
-        ) / 4  # Quarterly revenue
-        
-        # Calculate investment returns
-        investment_income = 0
+    def _company_investment_returns(self, company):
+        """Return a company's (income, unrealized_gains) from this turn's asset prices."""
+        total_income = 0
         unrealized_gains = 0
         
-        # Update asset prices and calculate income
+        investments = company.investments
+        if not investments:
+            return total_income, unrealized_gains
+        
         for asset_name, asset in self.investment_assets.items():
-            shares = company.investments.get(asset_name, 0)
+            shares = investments.get(asset_name, 0)
             if shares > 0:
                 # Calculate quarterly income (dividends/interest)
-                income = asset.get_quarterly_income(shares)
-                investment_income += income
+                total_income += asset.get_quarterly_income(shares)
                 
-                # Update price and calculate unrealized gains
-                old_price = asset.current_price
-                asset.update_price()
-                price_change = asset.current_price - old_price
+                # Calculate unrealized gains from this turn's price change
+                price_change = asset.current_price - asset.previous_price
                 unrealized_gains += price_change * shares
         
-        # Add income to cash (dividends/interest are realized)
-        company.cash += investment_income
-        
-        # Calculate claims from this turn
-        current_claims = sum(
-            claim["amount"]
-            for claim in company.claims_history
-            if claim.get("turn") == self.current_turn
+        return total_income, unrealized_gains
+    
+    def _company_investment_value(self, company) -> float:
+        """Return the market value of a company's investments at current asset prices."""
+        return sum(
+            shares * self.investment_assets[asset_name].current_price
+            for asset_name, shares in company.investments.items()
         )
-        
-        # Generate report
+    
+    def _generate_company_report(self, company, policies: np.ndarray, premium_revenue: float,
+                                 investment_income: float, unrealized_gains: float, claims_paid: float):
+        """Generate a financial report for a specific company from this turn's totals."""
         return FinancialReport(
             period=self.current_turn,
             revenue=premium_revenue,
-            claims_paid=current_claims,
+            claims_paid=claims_paid,
             investment_returns=investment_income,  # Only realized income
             unrealized_gains=unrealized_gains,    # Track separately
-            operating_expenses=50000  # Fixed quarterly operating expenses
+            operating_expenses=50000,  # Fixed quarterly operating expenses
+            cash=company.cash,
+            investment_value=self._company_investment_value(company),
+            policies_by_line=dict(zip(self.market.line_names, policies.tolist()))
         )
     
     def buy_asset(self, asset_name: str, shares: int) -> bool:
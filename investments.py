@@ -1,27 +1,23 @@
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Optional
+import math
 import numpy as np
+from asset import Asset as PooledAsset, AssetPool
 
-class Asset:
-    """Represents a specific investment asset with price and income characteristics."""
-    def __init__(self, name: str, current_price: float, dividend_yield: float, volatility: float):
-        self.name = name
-        self.current_price = current_price
-        self.dividend_yield = dividend_yield  # Annual yield
-        self.volatility = volatility  # Standard deviation for price changes
-        self.price_history: List[float] = [current_price]
+# Random walk with drift: 5% annual expected return, converted to daily
+TRADING_DAYS = 252
+SQRT_TRADING_DAYS = math.sqrt(TRADING_DAYS)
+DAILY_DRIFT = 0.05 / TRADING_DAYS
 
+class Asset(PooledAsset):
+    """Represents a specific investment asset with price and income characteristics."""
+    __slots__ = ()
+    
     def update_price(self) -> None:
         """Update the asset price with random walk and volatility."""
-        # Random walk with drift
-        drift = 0.05  # 5% annual expected return
-        daily_drift = drift / 252  # Convert to daily
-        daily_vol = self.volatility / np.sqrt(252)  # Convert to daily
-        
         # Generate random return
-        random_return = np.random.normal(daily_drift, daily_vol)
-        self.current_price *= (1 + random_return)
-        self.price_history.append(self.current_price)
+        random_return = self.pool.rng.normal(DAILY_DRIFT, self.volatility / SQRT_TRADING_DAYS)
+        self.pool.apply_returns(random_return, np.array([self.index]))
     
     def get_quarterly_income(self, shares: int) -> float:
         """Calculate quarterly dividend/interest income."""
@@ -29,37 +25,45 @@ class Asset:
 
 class InvestmentPortfolio:
     """Manages a collection of investment assets and portfolio operations."""
-    def __init__(self):
+    def __init__(self, rng: Optional[np.random.Generator] = None):
+        # Prices, yields and volatilities of all assets live in one pool's parallel arrays,
+        # and all price moves come from the pool's generator (shared with the game when given)
+        self.pool = AssetPool(rng=rng)
         self.assets: Dict[str, Asset] = {
             "SP500": Asset(
                 name="S&P 500 ETF",
                 current_price=450.0,
                 dividend_yield=0.015,  # 1.5% dividend yield
-                volatility=0.15  # 15% annual volatility
+                volatility=0.15,  # 15% annual volatility
+                pool=self.pool
             ),
             "CORP_BONDS": Asset(
                 name="Corporate Bond ETF",
                 current_price=100.0,
                 dividend_yield=0.045,  # 4.5% yield
-                volatility=0.08  # 8% annual volatility
+                volatility=0.08,  # 8% annual volatility
+                pool=self.pool
             ),
             "LONG_TREASURY": Asset(
                 name="Long-Term Treasury ETF",
                 current_price=90.0,
                 dividend_yield=0.035,  # 3.5% yield
-                volatility=0.12  # 12% annual volatility
+                volatility=0.12,  # 12% annual volatility
+                pool=self.pool
             ),
             "SHORT_TREASURY": Asset(
                 name="Short-Term Treasury ETF",
                 current_price=50.0,
                 dividend_yield=0.02,  # 2% yield
-                volatility=0.03  # 3% annual volatility
+                volatility=0.03,  # 3% annual volatility
+                pool=self.pool
             ),
             "REIT": Asset(
                 name="Real Estate Investment Trust ETF",
                 current_price=80.0,
                 dividend_yield=0.06,  # 6% dividend yield
-                volatility=0.20  # 20% annual volatility
+                volatility=0.20,  # 20% annual volatility
+                pool=self.pool
             )
         }
         self.holdings: Dict[str, int] = {}  # {asset_id: number_of_shares}
@@ -100,37 +104,37 @@ class InvestmentPortfolio:
         self.holdings[asset_id] = current_shares - shares
         return True, proceeds
     
+    def _holdings_array(self) -> np.ndarray:
+        """Return shares held of each asset, aligned with the pool's arrays."""
+        holdings = self.holdings
+        shares = np.zeros(self.pool.size)
+        for asset_id, asset in self.assets.items():
+            shares[asset.index] = holdings.get(asset_id, 0)
+        return shares
+    
     def update_prices(self) -> None:
-        """Update prices for all assets."""
-        for asset in self.assets.values():
-            asset.update_price()
+        """Update prices for all assets in one vectorized step."""
+        daily_vols = self.pool.volatility[:self.pool.size] / SQRT_TRADING_DAYS
+        self.pool.apply_returns(self.pool.rng.normal(DAILY_DRIFT, daily_vols))
     
     def calculate_returns(self) -> tuple[float, float]:
         """
         Calculate quarterly returns from investments.
         Returns (income, unrealized_gains) tuple.
         """
-        total_income = 0.0
-        unrealized_gains = 0.0
+        pool = self.pool
+        n = pool.size
+        shares = self._holdings_array()
         
-        for asset_id, asset in self.assets.items():
-            shares = self.holdings.get(asset_id, 0)
-            if shares > 0:
-                # Calculate quarterly income (dividends/interest)
-                income = asset.get_quarterly_income(shares)
-                total_income += income
-                
-                # Update price and calculate unrealized gains
-                old_price = asset.current_price
-                asset.update_price()
-                price_change = asset.current_price - old_price
-                unrealized_gains += price_change * shares
+        # Calculate quarterly income (dividends/interest) at current prices
+        total_income = float(np.dot(pool.dividend_yield[:n] * pool.current_price[:n], shares)) / 4
+        
+        # Update every price once, then calculate unrealized gains
+        self.update_prices()
+        unrealized_gains = float(np.dot(pool.current_price[:n] - pool.previous_price[:n], shares))
         
         return total_income, unrealized_gains
     
     def get_total_value(self) -> float:
         """Calculate total market value of all holdings."""
-        return sum(
-            self.assets[asset_id].current_price * shares
-            for asset_id, shares in self.holdings.items()
-        ) 
\ No newline at end of file
+        return float(np.dot(self.pool.current_price[:self.pool.size], self._holdings_array())) 
\ No newline at end of file
@@ -2,11 +2,13 @@ import pygame
 import sys
 import os
 import asyncio
+import random
+import time
 from typing import Optional, Dict, Any, Union
 from ui import GameUI, Colors
 from game_logic import GameState
-from utils import save_game_state, load_game_state
-from analytics import generate_r_visualization
+from utils import save_game_state, serialize_game_state, write_save_async, load_game_state
+from analytics import generate_r_visualization, tick as analytics_tick, flush_due as analytics_flush_due, flush_local_events_async
 
 # Detect if we're running in a browser environment
 IS_BROWSER = False
@@ -16,6 +18,9 @@ try:
 except:
     pass
 
+# Set to True to log input events and lifecycle messages to the console
+DEBUG = False
+
 # Configure touch input for mobile devices
 def setup_touch_input():
     """Configure touch input for mobile devices."""
@@ -60,64 +65,236 @@ def setup_touch_input():
         except Exception as e:
             print(f"Could not set up touch input: {e}")
 
-# Add a loading screen for browser version
-def show_loading_screen(screen, progress):
-    """Show a loading screen with progress bar."""
-    # Fill screen with a light blue background
-    bg_color = (230, 240, 250)
-    screen.fill(bg_color)
-    
-    # Calculate screen dimensions
-    width, height = screen.get_size()
+def coalesce_mouse_motion(events):
+    """Drop mouse motion events that are immediately followed by another one; only the last position matters."""
+    return [
+        event for event, next_event in zip(events, events[1:] + [None])
+        if not (event.type == pygame.MOUSEMOTION and next_event is not None and next_event.type == pygame.MOUSEMOTION)
+    ]
+
+# Fonts reused across loading screen frames (SysFont scans system fonts on each call)
+_font_cache = {}
+
+def _get_font(name, size, bold=False):
+    """Return a cached system font."""
+    key = (name, size, bold)
+    font = _font_cache.get(key)
+    if font is None:
+        font = _font_cache[key] = pygame.font.SysFont(name, size, bold=bold)
+    return font
+
+LOADING_TIPS = (
+    "Tip: Set your premium rates based on risk exposure in each state",
+    "Tip: Catastrophes happen rarely but can be devastating",
+    "Tip: Diversify your investment portfolio to manage risk",
+    "Tip: Start with conservative pricing until you build capital",
+    "Tip: You can now play offline after the first load!",
+    "Tip: Add to home screen for app-like experience",
+    "Tip: Balance growth with profitability for long-term success"
+)
+
+# One tip per boot, so every loading frame shows the same static background
+_loading_tip = random.choice(LOADING_TIPS)
+_loading_bg_cache = {}
+
+_loading_layout_cache = {}
+
+def _loading_layout(width, height):
+    """Return the loading screen's positions for a screen size, computed once per size."""
+    layout = _loading_layout_cache.get((width, height))
+    if layout is None:
+        bar_width = width * 0.7
+        layout = _loading_layout_cache[(width, height)] = {
+            "bar_width": bar_width,
+            "bar_rect": pygame.Rect((width - bar_width) // 2, height * 0.6, bar_width, 30),
+            "title_center": (width // 2, height // 3),
+            "subtitle_center": (width // 2, height // 3 + 60),
+            "tip_center": (width // 2, height * 0.8),
+            "pct_center": (width // 2, height * 0.6 + 50),
+        }
+    return layout
+
+def _loading_background(width, height):
+    """Return the static part of the loading screen: background, titles, empty bar and tip."""
+    key = (width, height, _loading_tip)
+    background = _loading_bg_cache.get(key)
+    if background is not None:
+        return background
     
-    # Draw title
-    font_large = pygame.font.SysFont('Arial', 48, bold=True)
-    title = font_large.render("Insurance Simulation Game", True, (30, 60, 120))
-    title_rect = title.get_rect(center=(width // 2, height // 3))
-    screen.blit(title, title_rect)
+    # Fill with a light blue background
+    background = pygame.Surface((width, height)).convert()
+    background.fill((230, 240, 250))
     
-    # Draw subtitle
-    font_medium = pygame.font.SysFont('Arial', 24)
-    subtitle = font_medium.render("Loading game assets...", True, (60, 90, 150))
-    subtitle_rect = subtitle.get_rect(center=(width // 2, height // 3 + 60))
-    screen.blit(subtitle, subtitle_rect)
+    layout = _loading_layout(width, height)
     
     # Draw progress bar border
-    bar_width = width * 0.7
-    bar_height = 30
-    bar_rect = pygame.Rect((width - bar_width) // 2, height * 0.6, bar_width, bar_height)
-    pygame.draw.rect(screen, (100, 100, 100), bar_rect, 2)
+    pygame.draw.rect(background, (100, 100, 100), layout["bar_rect"], 2)
+    
+    # Draw title, subtitle and a tip at the bottom in one batched call
+    title = _get_font('Arial', 48, True).render("Insurance Simulation Game", True, (30, 60, 120))
+    subtitle = _get_font('Arial', 24).render("Loading game assets...", True, (60, 90, 150))
+    tip = _get_font('Arial', 18).render(_loading_tip, True, (80, 80, 80))
+    texts = [
+        (title, title.get_rect(center=layout["title_center"])),
+        (subtitle, subtitle.get_rect(center=layout["subtitle_center"])),
+        (tip, tip.get_rect(center=layout["tip_center"]))
+    ]
+    if hasattr(background, "fblits"):  # pygame-ce
+        background.fblits(texts)
+    else:
+        background.blits(texts, doreturn=False)
+    
+    _loading_bg_cache[key] = background
+    return background
+
+_loading_pct_cache = {}
+
+def _loading_percentage(percent):
+    """Return the rendered percentage label, converted to the display format once per value."""
+    label = _loading_pct_cache.get(percent)
+    if label is None:
+        label = _get_font('Arial', 24).render(f"{percent}%", True, (30, 60, 120))
+        if pygame.display.get_surface() is not None:
+            label = label.convert_alpha()
+        _loading_pct_cache[percent] = label
+    return label
+
+# Add a loading screen for browser version
+def show_loading_screen(screen, progress):
+    """Show a loading screen with progress bar."""
+    width, height = screen.get_size()
+    layout = _loading_layout(width, height)
+    screen.blit(_loading_background(width, height), (0, 0))
     
     # Draw progress bar fill
-    fill_width = bar_width * max(0.0, min(1.0, progress))
-    fill_rect = pygame.Rect((width - bar_width) // 2, height * 0.6, fill_width, bar_height)
+    fill_rect = layout["bar_rect"].copy()
+    fill_rect.width = int(layout["bar_width"] * max(0.0, min(1.0, progress)))
     pygame.draw.rect(screen, (50, 150, 50), fill_rect)
     
     # Draw progress percentage
-    percentage = font_medium.render(f"{int(progress * 100)}%", True, (30, 60, 120))
-    percentage_rect = percentage.get_rect(center=(width // 2, height * 0.6 + 50))
-    screen.blit(percentage, percentage_rect)
-    
-    # Draw a tip at the bottom
-    tips = [
-        "Tip: Set your premium rates based on risk exposure in each state",
-        "Tip: Catastrophes happen rarely but can be devastating",
-        "Tip: Diversify your investment portfolio to manage risk",
-        "Tip: Start with conservative pricing until you build capital",
-        "Tip: You can now play offline after the first load!",
-        "Tip: Add to home screen for app-like experience",
-        "Tip: Balance growth with profitability for long-term success"
-    ]
-    import random
-    tip_text = random.choice(tips)
-    font_small = pygame.font.SysFont('Arial', 18)
-    tip = font_small.render(tip_text, True, (80, 80, 80))
-    tip_rect = tip.get_rect(center=(width // 2, height * 0.8))
-    screen.blit(tip, tip_rect)
+    percentage = _loading_percentage(int(progress * 100))
+    screen.blit(percentage, percentage.get_rect(center=layout["pct_center"]))
     
     # Update display
     pygame.display.flip()
 
+# Background autosave and analytics writes still running (kept referenced until done)
+_save_tasks = set()
+
+def _start_background_write(coro):
+    """Run a file write as a task the final save waits for."""
+    task = asyncio.create_task(coro)
+    _save_tasks.add(task)
+    task.add_done_callback(_save_tasks.discard)
+
+def _on_end_turn(game_state, game_ui, arg=""):
+    """Autosave in the background, then advance the game one turn and show its summary."""
+    if not game_state:
+        return game_state
+    
+    # Serialize now so the autosave holds the state before updating; only the write is deferred
+    json_str = serialize_game_state(game_state)
+    if json_str is not None:
+        _start_background_write(write_save_async(json_str, 'autosave.json'))
+    
+    # Update game state for the next turn
+    game_state.update()
+    
+    # Show turn summary
+    game_ui.show_turn_summary(game_state)
+    return game_state
+
+def _on_save(game_state, game_ui, filename):
+    """Save the game under the file name chosen in the UI."""
+    if not game_state:
+        return game_state
+    try:
+        if not filename.endswith('.json'):
+            filename += '.json'
+        success = save_game_state(game_state, filename)
+        if success:
+            game_ui.show_save_load_message(f"Game saved as {filename}", Colors.GREEN)
+            print(f"Game saved as {filename}")
+        else:
+            game_ui.show_save_load_message("Failed to save game", Colors.RED)
+            print("Failed to save game")
+    except Exception as e:
+        game_ui.show_save_load_message(f"Error: {str(e)}", Colors.RED)
+        print(f"Save error: {e}")
+    return game_state
+
+def _on_load(game_state, game_ui, filename):
+    """Load the game from the file chosen in the UI; returns the loaded (or unchanged) state."""
+    try:
+        load_data = load_game_state(filename)
+        if load_data:
+            game_state = GameState.from_dict(load_data)
+            game_ui.showing_save_load = False
+            game_ui.in_startup = False
+            print(f"Game loaded from {filename}")
+        else:
+            game_ui.show_save_load_message("Failed to load game", Colors.RED)
+            print("Failed to load game")
+    except Exception as e:
+        game_ui.show_save_load_message(f"Error: {str(e)}", Colors.RED)
+        print(f"Load error: {e}")
+    return game_state
+
+def _on_analytics(game_state, game_ui, arg=""):
+    """Export analytics for the game so far and open the output folder on desktop."""
+    if not game_state or game_ui.in_startup:
+        return game_state
+    try:
+        if len(game_state.financial_history) > 0:
+            output_dir = generate_r_visualization(game_state)
+            if output_dir:
+                game_ui.show_save_load_message(f"Analytics generated in {output_dir}", Colors.GREEN)
+                # Try to open the folder with the default file explorer
+                try:
+                    if not IS_BROWSER:
+                        os.startfile(os.path.abspath(output_dir))
+                except Exception as e:
+                    print(f"Could not open output directory: {e}")
+            else:
+                game_ui.show_save_load_message("Failed to generate analytics", Colors.RED)
+        else:
+            game_ui.show_save_load_message("Not enough data for analytics", Colors.YELLOW)
+    except Exception as e:
+        game_ui.show_save_load_message(f"Analytics error: {str(e)}", Colors.RED)
+        print(f"Analytics error: {e}")
+    return game_state
+
+# Commands the UI can return from handle_event, as "command" or "command:argument"
+UI_COMMANDS = {
+    "end_turn": _on_end_turn,
+    "save": _on_save,
+    "load": _on_load,
+    "analytics": _on_analytics,
+}
+
+def _start_new_game(options, game_ui):
+    """Create the game from the startup screen's options and leave startup mode."""
+    # Initialize game state with selected options
+    game_state = GameState(
+        initial_state=options["state"],
+        company_name=options["name"]
+    )
+    
+    # Initialize premium rates for the selected state
+    game_state.player_company.premium_rates = {}
+    state_id = options["state"]
+    game_state.player_company.premium_rates[f"{state_id}_home"] = game_state.base_market_rates[f"{state_id}_home"]
+    game_state.player_company.premium_rates[f"{state_id}_auto"] = game_state.base_market_rates[f"{state_id}_auto"]
+    
+    # Initialize starting policies for the selected state
+    game_state.player_company.policies_sold = {}
+    game_state.player_company.policies_sold[f"{state_id}_home"] = 500
+    game_state.player_company.policies_sold[f"{state_id}_auto"] = 1000
+    
+    # Exit startup mode
+    game_ui.in_startup = False
+    return game_state
+
 async def main():
     """Main entry point for the Insurance Simulation Game."""
     # Initialize Pygame
@@ -126,10 +303,18 @@ async def main():
     # Set up the display - use a canvas size that works well for browsers
     screen_width = 1280
     screen_height = 720
-    flags = pygame.SCALED | pygame.RESIZABLE  # Better browser viewport handling
+    # The UI is laid out for this fixed size and stretched once to the window: in the browser
+    # pygbag scales the canvas element itself, so SCALED would only add a second software pass;
+    # on desktop SCALED lets SDL do the stretch on the GPU
+    flags = pygame.RESIZABLE if IS_BROWSER else pygame.SCALED | pygame.RESIZABLE
     screen = pygame.display.set_mode((screen_width, screen_height), flags)
     pygame.display.set_caption("Insurance Simulation Game")
     
+    # Drop joystick and controller motion streams the game never reads before they reach Python;
+    # everything else (wheel, touch, window focus) stays queued for the UI
+    pygame.event.set_blocked([pygame.JOYAXISMOTION, pygame.JOYBALLMOTION, pygame.JOYHATMOTION,
+                              pygame.CONTROLLERAXISMOTION])
+    
     # Show loading screen if in browser
     if IS_BROWSER:
         # Initial loading screen
@@ -152,6 +337,7 @@ async def main():
     # Set up game clock
     clock = pygame.time.Clock()
     FPS = 60
+    frame_time = 1.0 / FPS
     
     # Setup touch input for mobile devices if in browser
     if IS_BROWSER:
@@ -163,7 +349,7 @@ async def main():
     try:
         if IS_BROWSER:
             show_loading_screen(screen, 0.8)
-            
+        
         os.makedirs('saves', exist_ok=True)
         
         # Auto-load last save if it exists
@@ -182,7 +368,8 @@ async def main():
         show_loading_screen(screen, 1.0)
         await asyncio.sleep(0.5)  # Short pause at 100% for visual feedback
     
-    print("Game initialized successfully!")  # Debug print
+    if DEBUG:
+        print("Game initialized successfully!")
     if IS_BROWSER:
         try:
             import javascript
@@ -192,172 +379,101 @@ async def main():
     
     # Main game loop
     running = True
+    dirty = True  # Set by input events; idle frames skip rendering unless the UI is animating
     while running:
-        # Process all events
-        for event in pygame.event.get():
+        frame_start = time.monotonic()
+        
+        # Share one timestamp across all analytics events tracked this frame
+        analytics_tick()
+        
+        # Process all events (touch drags can queue several motions per frame)
+        for event in coalesce_mouse_motion(pygame.event.get()):
+            dirty = True
             if event.type == pygame.QUIT:
-                # Auto-save before quitting
-                try:
-                    if game_state and not game_ui.in_startup:
-                        save_game_state(game_state, 'autosave.json')
-                except Exception as e:
-                    print(f"Save error: {e}")
+                # The final autosave after the loop covers quitting
                 running = False
-                print("Quit event received")  # Debug print
+                if DEBUG:
+                    print("Quit event received")
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     running = False
-                    print("Escape key pressed")  # Debug print
-                elif event.key == pygame.K_s and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                    # Save game on Ctrl+S
-                    try:
-                        if game_state and not game_ui.in_startup:
-                            success = save_game_state(game_state, 'autosave.json')
-                            print(f"Game saved: {success}")
-                    except Exception as e:
-                        print(f"Save error: {e}")
-                elif event.key == pygame.K_l and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                    # Load game on Ctrl+L
-                    try:
-                        load_data = load_game_state('autosave.json')
-                        if load_data:
-                            game_state = GameState.from_dict(load_data)
-                            game_ui.in_startup = False
-                            print("Game loaded successfully")
-                    except Exception as e:
-                        print(f"Load error: {e}")
-                elif event.key == pygame.K_a and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                    # Generate analytics with Ctrl+A
-                    if game_state and not game_ui.in_startup and len(game_state.financial_history) > 0:
+                    if DEBUG:
+                        print("Escape key pressed")
+                elif event.mod & pygame.KMOD_CTRL:
+                    # Ctrl shortcuts (the event carries the modifier state, so no SDL query is needed)
+                    if event.key == pygame.K_s:
+                        # Save game on Ctrl+S
                         try:
-                            output_dir = generate_r_visualization(game_state)
-                            if output_dir:
-                                game_ui.show_save_load_message(f"Analytics generated in {output_dir}", Colors.GREEN)
-                                # Try to open the folder with the default file explorer
-                                try:
-                                    if not IS_BROWSER:
-                                        os.startfile(os.path.abspath(output_dir))
-                                except Exception as e:
-                                    print(f"Could not open output directory: {e}")
-                            else:
-                                game_ui.show_save_load_message("Failed to generate analytics", Colors.RED)
+                            if game_state and not game_ui.in_startup:
+                                success = save_game_state(game_state, 'autosave.json')
+                                print(f"Game saved: {success}")
                         except Exception as e:
-                            game_ui.show_save_load_message(f"Analytics error: {str(e)}", Colors.RED)
-                            print(f"Analytics error: {e}")
+                            print(f"Save error: {e}")
+                    elif event.key == pygame.K_l:
+                        # Load game on Ctrl+L
+                        try:
+                            load_data = load_game_state('autosave.json')
+                            if load_data:
+                                game_state = GameState.from_dict(load_data)
+                                game_ui.in_startup = False
+                                print("Game loaded successfully")
+                        except Exception as e:
+                            print(f"Load error: {e}")
+                    elif event.key == pygame.K_a:
+                        # Generate analytics with Ctrl+A
+                        if game_state and not game_ui.in_startup:
+                            _on_analytics(game_state, game_ui)
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                print(f"Mouse click at {pygame.mouse.get_pos()}")  # Debug print
+                if DEBUG:
+                    print(f"Mouse click at {event.pos}")
             elif event.type == pygame.VIDEORESIZE:
-                # Handle window resize event
-                screen = pygame.display.set_mode((event.w, event.h), flags)
+                # SDL or the browser rescales the fixed-size display, so a resize only needs the
+                # redraw flagged above; re-creating the display at the window size would leave the
+                # UI laid out for 1280x720 in one corner
+                pass
             
-            # Pass event to UI
+            # Pass event to UI and run the command it returns, if any
             result = game_ui.handle_event(event)
-            
-            # Handle UI results - check type first
-            if result == "end_turn" and game_state:
-                # Save game before updating
-                try:
-                    save_game_state(game_state, 'autosave.json')
-                except Exception as e:
-                    print(f"Save error: {e}")
-                
-                # Update game state for the next turn
-                game_state.update()
-                
-                # Show turn summary
-                game_ui.show_turn_summary(game_state)
-            elif isinstance(result, str) and result.startswith("save:") and game_state:
-                # Handle save command from UI
-                try:
-                    filename = result.split(":")[1]
-                    if not filename.endswith('.json'):
-                        filename += '.json'
-                    success = save_game_state(game_state, filename)
-                    if success:
-                        game_ui.show_save_load_message(f"Game saved as {filename}", Colors.GREEN)
-                        print(f"Game saved as {filename}")
-                    else:
-                        game_ui.show_save_load_message("Failed to save game", Colors.RED)
-                        print("Failed to save game")
-                except Exception as e:
-                    game_ui.show_save_load_message(f"Error: {str(e)}", Colors.RED)
-                    print(f"Save error: {e}")
-            elif isinstance(result, str) and result.startswith("load:"):
-                # Handle load command from UI
-                try:
-                    filename = result.split(":")[1]
-                    load_data = load_game_state(filename)
-                    if load_data:
-                        game_state = GameState.from_dict(load_data)
-                        game_ui.showing_save_load = False
-                        game_ui.in_startup = False
-                        print(f"Game loaded from {filename}")
-                    else:
-                        game_ui.show_save_load_message("Failed to load game", Colors.RED)
-                        print("Failed to load game")
-                except Exception as e:
-                    game_ui.show_save_load_message(f"Error: {str(e)}", Colors.RED)
-                    print(f"Load error: {e}")
-            elif result == "analytics" and game_state and not game_ui.in_startup:
-                # Handle analytics request from UI
-                try:
-                    if len(game_state.financial_history) > 0:
-                        output_dir = generate_r_visualization(game_state)
-                        if output_dir:
-                            game_ui.show_save_load_message(f"Analytics generated in {output_dir}", Colors.GREEN)
-                            # Try to open the folder with the default file explorer
-                            try:
-                                if not IS_BROWSER:
-                                    os.startfile(os.path.abspath(output_dir))
-                            except Exception as e:
-                                print(f"Could not open output directory: {e}")
-                        else:
-                            game_ui.show_save_load_message("Failed to generate analytics", Colors.RED)
-                    else:
-                        game_ui.show_save_load_message("Not enough data for analytics", Colors.YELLOW)
-                except Exception as e:
-                    game_ui.show_save_load_message(f"Analytics error: {str(e)}", Colors.RED)
-                    print(f"Analytics error: {e}")
+            if isinstance(result, str):
+                command, _, arg = result.partition(":")
+                handler = UI_COMMANDS.get(command)
+                if handler:
+                    game_state = handler(game_state, game_ui, arg)
             elif result and game_ui.in_startup and isinstance(result, dict):
-                # Initialize game state with selected options
-                game_state = GameState(
-                    initial_state=result["state"],
-                    company_name=result["name"]
-                )
-                
-                # Initialize premium rates for the selected state
-                game_state.player_company.premium_rates = {}
-                state_id = result["state"]
-                game_state.player_company.premium_rates[f"{state_id}_home"] = game_state.base_market_rates[f"{state_id}_home"]
-                game_state.player_company.premium_rates[f"{state_id}_auto"] = game_state.base_market_rates[f"{state_id}_auto"]
-                
-                # Initialize starting policies for the selected state
-                game_state.player_company.policies_sold = {}
-                game_state.player_company.policies_sold[f"{state_id}_home"] = 500
-                game_state.player_company.policies_sold[f"{state_id}_auto"] = 1000
-                
-                # Exit startup mode
-                game_ui.in_startup = False
+                game_state = _start_new_game(result, game_ui)
         
-        # Update display
-        screen.fill(Colors.WHITE)  # Clear screen
-        game_ui.render(game_state)
-        pygame.display.flip()
+        # Update display (every redraw repaints the whole window, so present it all)
+        if dirty or game_ui.needs_redraw:
+            screen.fill(Colors.WHITE)  # Clear screen
+            game_ui.render(game_state)
+            pygame.display.flip()
+            dirty = False
         
-        # Control frame rate
-        clock.tick(FPS)
+        # Write batched analytics events off the frame loop
+        if analytics_flush_due():
+            _start_background_write(flush_local_events_async())
         
-        # This is essential for Pygbag to work in browser context
-        await asyncio.sleep(0)
+        # Control frame rate
+        if IS_BROWSER:
+            # Hand the rest of the frame to the browser instead of busy-waiting in clock.tick
+            await asyncio.sleep(max(0.0, frame_time - (time.monotonic() - frame_start)))
+        else:
+            clock.tick(FPS)
+            await asyncio.sleep(0)
     
-    # Final autosave before closing
+    # Let pending autosaves finish, then do a final autosave before closing
     try:
+        if _save_tasks:
+            await asyncio.gather(*_save_tasks)
         if game_state and not game_ui.in_startup:
-            save_game_state(game_state, 'autosave.json')
+            json_str = serialize_game_state(game_state)
+            if json_str is not None:
+                await write_save_async(json_str, 'autosave.json')
     except Exception as e:
         print(f"Final save error: {e}")
     
-    print("Game closing...")  # Debug print
+    if DEBUG:
+        print("Game closing...")
     pygame.quit()
     return 0  # Return 0 instead of sys.exit() for better browser compatibility
 
@@ -1,13 +1,21 @@
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import math
 import numpy as np
 
-@dataclass
+from choice_kernel import choose_providers
+
+# Generator for segments used without a MarketDynamics-provided one
+_default_rng = np.random.default_rng()
+
+@dataclass(frozen=True, slots=True)
 class StateCharacteristics:
     """Characteristics and risk factors for a state market."""
+    
     name: str
     catastrophe_risk: float
-    cat_severity: float
+    cat_severity: float  # Log of the average catastrophe claim (lognormal mean parameter)
+    cat_severity_dollars: float  # Average catastrophe claim in dollars (for rate loading)
     market_size_multiplier: float
     entry_cost: float
 
@@ -24,80 +32,132 @@ class Consumer:
 
 @dataclass
 class MarketSegment:
-    """Represents a market segment with specific risk characteristics."""
+    """
+    Represents a market segment with specific risk characteristics.
+    
+    The segment's consumers are held as parallel arrays, one entry per consumer.
+    Providers are stored as indices into provider_names (-1 for none).
+    """
     name: str
     base_risk: float
     market_size: int
     current_demand: int
-    consumers: List[Consumer]
+    state: str
+    line: str
+    price_sensitivity: np.ndarray = field(repr=False, compare=False)  # How sensitive each consumer is to price differences
+    loyalty: np.ndarray = field(repr=False, compare=False)  # How much each consumer values staying with their provider
+    satisfaction: np.ndarray = field(repr=False, compare=False)  # Satisfaction with the current provider (0-1)
+    current_provider: np.ndarray = field(repr=False, compare=False)  # int16 index into provider_names, -1 for none
+    provider_names: List[str] = field(default_factory=list, repr=False, compare=False)
+    
+    @property
+    def consumers(self) -> List[Consumer]:
+        """The segment's consumers as Consumer objects (a snapshot; changes are not written back)."""
+        providers = [self.provider_names[p] if p >= 0 else None for p in self.current_provider.tolist()]
+        return [
+            Consumer(
+                id=f"{self.state}_{self.line}_{i}",
+                state=self.state,
+                line=self.line,
+                price_sensitivity=price_sensitivity,
+                loyalty=loyalty,
+                current_provider=provider,
+                satisfaction=satisfaction
+            )
+            for i, (price_sensitivity, loyalty, satisfaction, provider) in enumerate(zip(
+                self.price_sensitivity.tolist(), self.loyalty.tolist(), self.satisfaction.tolist(), providers))
+        ]
+    
+    def _provider_ids(self, names: List[str]) -> np.ndarray:
+        """Return the provider index of each company name, registering names not seen before."""
+        provider_names = self.provider_names
+        for name in names:
+            if name not in provider_names:
+                provider_names.append(name)
+        return np.array([provider_names.index(name) for name in names], dtype=np.int16)
+    
+    @staticmethod
+    def _company_factors(prices: np.ndarray, ad_budgets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the per-company price factor, advertising factor and can-win mask for
+        arrays of premiums and advertising budgets. These are the same for every
+        consumer, so they are computed once per choice step.
+        """
+        # Price relative to the lowest in the market
+        prices = np.asarray(prices, dtype=np.float64)
+        price_factor = np.where(prices > 0, prices.min() / np.where(prices > 0, prices, 1.0), 1.0)
+        
+        # Advertising has diminishing returns (budgets normalized by 10k for reasonable scaling);
+        # a budget of -10k or less (bankrupt company) has no valid factor and never wins a consumer
+        ad_budgets = np.asarray(ad_budgets, dtype=np.float64) / 10000
+        can_win = ad_budgets > -1
+        ad_factor = 1.0 + 0.2 * np.log1p(np.where(can_win, ad_budgets, 0.0))
+        return price_factor, ad_factor, can_win
     
     def calculate_consumer_choice(self, consumer: Consumer, companies: Dict[str, float], 
-                                advertising: Dict[str, float]) -> str:
+                                advertising: Dict[str, float],
+                                rng: Optional[np.random.Generator] = None) -> Optional[str]:
         """Calculate which company a consumer will choose based on their preferences."""
-        best_score = float('-inf')
-        best_company = None
+        rng = rng if rng is not None else _default_rng
+        names = list(companies)
+        if not names:
+            return None
         
-        base_price = min(companies.values())  # Use lowest price as reference
+        price_factor, ad_factor, can_win = self._company_factors(
+            list(companies.values()), [advertising.get(name, 0) for name in names]
+        )
+        provider = names.index(consumer.current_provider) if consumer.current_provider in companies else -1
+        chosen, _, _ = choose_providers(
+            price_factor, ad_factor, can_win, np.arange(len(names), dtype=np.int16),
+            np.array([consumer.price_sensitivity]), np.array([consumer.loyalty]),
+            np.array([consumer.satisfaction]), np.array([provider], dtype=np.int16),
+            rng.uniform(0.95, 1.05, (1, len(names)))
+        )
+        return names[chosen[0]] if chosen[0] >= 0 else None
+    
+    def update_demand(self, companies: Dict[str, float], advertising: Dict[str, float],
+                      rng: Optional[np.random.Generator] = None) -> Dict[str, int]:
+        """Update demand based on consumer choices, given each company's premium and advertising budget."""
+        names = list(companies)
+        counts = self.update_demand_arrays(
+            names, list(companies.values()), [advertising.get(name, 0) for name in names], rng
+        )
+        return dict(zip(names, counts.tolist()))
+    
+    def update_demand_arrays(self, names: List[str], prices, ad_budgets,
+                             rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Update demand based on consumer choices, with premiums and advertising budgets
+        given as arrays aligned with names. Returns the policies won by each company.
         
-        for company_name, price in companies.items():
-            # Calculate relative price (compared to lowest in market)
-            price_factor = (base_price / price) if price > 0 else 1.0
-            
-            # Calculate loyalty factor
-            loyalty_factor = 1.0
-            if consumer.current_provider == company_name:
-                loyalty_factor = 1.0 + (consumer.loyalty * consumer.satisfaction)
-            
-            # Calculate advertising factor (diminishing returns)
-            ad_budget = advertising.get(company_name, 0)
-            ad_factor = 1.0 + (0.2 * np.log1p(ad_budget / 10000))  # Normalize by 10k for reasonable scaling
-            
-            # Combined score with individual weights
-            score = (
-                price_factor ** consumer.price_sensitivity *  # Price sensitivity
-                loyalty_factor *  # Loyalty to current provider
-                ad_factor  # Advertising effect
-            )
-            
-            # Add small random variation
-            score *= np.random.uniform(0.95, 1.05)
-            
-            if score > best_score:
-                best_score = score
-                best_company = company_name
-        
-        return best_company
-    
-    def update_demand(self, companies: Dict[str, float], advertising: Dict[str, float]) -> Dict[str, int]:
-        """Update demand based on consumer choices."""
-        policies_by_company = {name: 0 for name in companies.keys()}
-        
-        for consumer in self.consumers:
-            chosen_company = self.calculate_consumer_choice(consumer, companies, advertising)
-            if chosen_company:
-                policies_by_company[chosen_company] += 1
-                
-                # Update consumer's provider and satisfaction
-                old_provider = consumer.current_provider
-                consumer.current_provider = chosen_company
-                
-                # Satisfaction is higher if they stayed (loyalty rewarded)
-                if old_provider == chosen_company:
-                    consumer.satisfaction = min(1.0, consumer.satisfaction + 0.1)
-                else:
-                    consumer.satisfaction = 0.5  # Reset satisfaction with new provider
-        
-        return policies_by_company
+        Scores every consumer against every company at once (see choice_kernel.choose_providers).
+        """
+        rng = rng if rng is not None else _default_rng
+        n_consumers, n_companies = len(self.current_provider), len(names)
+        if not n_consumers or not n_companies:
+            return np.zeros(n_companies, dtype=np.int64)
+        
+        # Each consumer scores every company (with a small random variation) and picks the best
+        price_factor, ad_factor, can_win = self._company_factors(prices, ad_budgets)
+        noise = rng.uniform(0.95, 1.05, (n_consumers, n_companies))
+        chosen, self.satisfaction, self.current_provider = choose_providers(
+            price_factor, ad_factor, can_win, self._provider_ids(names),
+            self.price_sensitivity, self.loyalty, self.satisfaction, self.current_provider, noise
+        )
+        return np.bincount(chosen[chosen >= 0], minlength=n_companies)
 
 class MarketDynamics:
     """Manages market conditions, demand, and risk factors."""
-    def __init__(self):
+    def __init__(self, rng: Optional[np.random.Generator] = None):
+        # All market randomness comes from one generator (shared with the game when given)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        
         # Define states and their characteristics
         self.states = {
             "CA": {
                 "name": "California",
                 "catastrophe_risk": 0.01,  # 1% chance of earthquake per year
-                "cat_severity": np.log(500000),  # Average catastrophe claim $500k
+                "cat_severity_dollars": 500000.0,  # Average catastrophe claim $500k
                 "market_size_multiplier": 1.5,  # Larger market
                 "entry_cost": 500000,  # $500k to enter
                 "consumer_traits": {
@@ -108,7 +168,7 @@ class MarketDynamics:
             "FL": {
                 "name": "Florida",
                 "catastrophe_risk": 0.05,  # 5% chance of hurricane per year
-                "cat_severity": np.log(250000),  # Average catastrophe claim $250k
+                "cat_severity_dollars": 250000.0,  # Average catastrophe claim $250k
                 "market_size_multiplier": 1.0,  # Base market size
                 "entry_cost": 300000,  # $300k to enter
                 "consumer_traits": {
@@ -118,126 +178,181 @@ class MarketDynamics:
             }
         }
         
+        # Catastrophe claims are drawn lognormally, so also keep the log of the average severity
+        for state_info in self.states.values():
+            state_info["cat_severity"] = math.log(state_info["cat_severity_dollars"])
+        
+        # Build every line id ("CA_home", ...) once and map it back to its state and line
+        self.segment_keys = {
+            (state_id, line): f"{state_id}_{line}"
+            for state_id in self.states for line in ("home", "auto")
+        }
+        self.line_to_state = {line_id: state_id for (state_id, _), line_id in self.segment_keys.items()}
+        self.line_is_home = {line_id: line == "home" for (_, line), line_id in self.segment_keys.items()}
+        
         # Initialize market segments and consumers
         self.market_segments = {}
         self._initialize_market_segments()
         
         # Initialize base market rates
         self.base_market_rates = self._calculate_base_rates()
+        
+        # Give each line a fixed ordinal so per-line values can be held in dense arrays
+        self.line_names = tuple(self.market_segments)
+        self.line_ids = {line_id: i for i, line_id in enumerate(self.line_names)}
+        self.base_rate_array = np.array([self.base_market_rates[line_id] for line_id in self.line_names])
+        self.market_size_array = np.array([self.market_segments[line_id].market_size for line_id in self.line_names])
+        
+        # State ordinals and quarterly catastrophe odds so all states can be rolled in one draw
+        self.state_names = tuple(self.states)
+        self.state_ids = {state_id: i for i, state_id in enumerate(self.state_names)}
+        self.quarterly_cat_risk = np.array([self.states[state_id]["catastrophe_risk"] / 4 for state_id in self.state_names])
+        self.line_state_index = np.array([self.state_ids[self.line_to_state[line_id]] for line_id in self.line_names])
+        self.line_is_home_array = np.array([self.line_is_home[line_id] for line_id in self.line_names])
+        
+        # Claim distributions never change during a game, so build them once
+        self.claim_distributions = {line_id: self._build_claim_distribution(line_id) for line_id in self.line_names}
+        self.claim_mean_array = np.array([self.claim_distributions[line_id]["mean"] for line_id in self.line_names])
+        self.claim_sigma_array = np.array([self.claim_distributions[line_id]["sigma"] for line_id in self.line_names])
+        self.cat_mean_array = np.array([self.claim_distributions[line_id].get("cat_mean", 0.0) for line_id in self.line_names])
     
     def _initialize_market_segments(self):
         """Initialize market segments and generate consumers for each segment."""
         for state_id, state_info in self.states.items():
             # Generate consumers for home insurance
-            home_consumers = self._generate_consumers(
-                state_id, "home",
-                int(2000 * state_info["market_size_multiplier"]),
-                state_info["consumer_traits"]
-            )
+            home_count = int(2000 * state_info["market_size_multiplier"])
+            home_price_sensitivity, home_loyalty = self._generate_consumers(home_count, state_info["consumer_traits"])
             
-            self.market_segments[f"{state_id}_home"] = MarketSegment(
+            self.market_segments[self.segment_keys[(state_id, "home")]] = MarketSegment(
                 name=f"Home Insurance - {state_info['name']}",
                 base_risk=0.05,  # 5% chance of regular claim per year
-                market_size=len(home_consumers),
-                current_demand=len(home_consumers),
-                consumers=home_consumers
+                market_size=home_count,
+                current_demand=home_count,
+                state=state_id,
+                line="home",
+                price_sensitivity=home_price_sensitivity,
+                loyalty=home_loyalty,
+                satisfaction=np.full(home_count, 0.5),  # Initial neutral satisfaction
+                current_provider=np.full(home_count, -1, dtype=np.int16)
             )
             
             # Generate consumers for auto insurance
-            auto_consumers = self._generate_consumers(
-                state_id, "auto",
-                int(5000 * state_info["market_size_multiplier"]),
-                state_info["consumer_traits"]
-            )
+            auto_count = int(5000 * state_info["market_size_multiplier"])
+            auto_price_sensitivity, auto_loyalty = self._generate_consumers(auto_count, state_info["consumer_traits"])
             
-            self.market_segments[f"{state_id}_auto"] = MarketSegment(
+            self.market_segments[self.segment_keys[(state_id, "auto")]] = MarketSegment(
                 name=f"Auto Insurance - {state_info['name']}",
                 base_risk=0.15,  # 15% chance of claim per year
-                market_size=len(auto_consumers),
-                current_demand=len(auto_consumers),
-                consumers=auto_consumers
-            )
-    
-    def _generate_consumers(self, state_id: str, line: str, count: int, traits: Dict) -> List[Consumer]:
-        """Generate a list of consumers with varying preferences."""
-        consumers = []
-        for i in range(count):
-            # Generate random traits based on state characteristics
-            price_sens_mean, price_sens_std = traits["price_sensitivity"]
-            loyalty_mean, loyalty_std = traits["loyalty"]
-            
-            consumer = Consumer(
-                id=f"{state_id}_{line}_{i}",
+                market_size=auto_count,
+                current_demand=auto_count,
                 state=state_id,
-                line=line,
-                price_sensitivity=max(0.1, np.random.normal(price_sens_mean, price_sens_std)),
-                loyalty=max(0, min(1, np.random.normal(loyalty_mean, loyalty_std))),
-                current_provider=None,
-                satisfaction=0.5  # Initial neutral satisfaction
+                line="auto",
+                price_sensitivity=auto_price_sensitivity,
+                loyalty=auto_loyalty,
+                satisfaction=np.full(auto_count, 0.5),  # Initial neutral satisfaction
+                current_provider=np.full(auto_count, -1, dtype=np.int16)
             )
-            consumers.append(consumer)
+    
+    def _generate_consumers(self, count: int, traits: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Generate price sensitivity and loyalty arrays for `count` consumers with varying preferences."""
+        price_sens_mean, price_sens_std = traits["price_sensitivity"]
+        loyalty_mean, loyalty_std = traits["loyalty"]
         
-        return consumers
+        # Draw each trait for the whole segment at once, based on state characteristics
+        price_sensitivity = np.maximum(self.rng.normal(price_sens_mean, price_sens_std, count), 0.1)
+        loyalty = np.clip(self.rng.normal(loyalty_mean, loyalty_std, count), 0.0, 1.0)
+        
+        return price_sensitivity, loyalty
     
     def _calculate_base_rates(self) -> Dict[str, float]:
         """Calculate base market rates for each line in each state."""
         base_rates = {}
         for state_id, state_info in self.states.items():
             # Add catastrophe risk loading to home insurance
-            cat_loading = state_info["catastrophe_risk"] * np.exp(state_info["cat_severity"])
+            cat_loading = state_info["catastrophe_risk"] * state_info["cat_severity_dollars"]
             
-            base_rates[f"{state_id}_home"] = 1200 + cat_loading
-            base_rates[f"{state_id}_auto"] = 900
+            base_rates[self.segment_keys[(state_id, "home")]] = 1200 + cat_loading
+            base_rates[self.segment_keys[(state_id, "auto")]] = 900
         return base_rates
     
-    def update_market(self, player_company, ai_competitors, advertising_budgets: Dict[str, Dict[str, float]]):
-        """Update market conditions and consumer choices."""
-        for line_id, segment in self.market_segments.items():
-            # Gather all companies' premium rates
-            company_rates = {
-                player_company.name: player_company.premium_rates.get(line_id, self.base_market_rates[line_id])
-            }
-            
-            for competitor in ai_competitors:
-                company_rates[competitor.name] = competitor.premium_rates.get(
-                    line_id, self.base_market_rates[line_id]
-                )
-            
-            # Process advertising budgets for this line_id
-            line_advertising = {}
-            for company_name, company_budget in advertising_budgets.items():
-                line_advertising[company_name] = company_budget.get(line_id, 0)
-            
+    def update_market(self, player_company, ai_competitors, advertising_budgets: Dict[str, Dict[str, float]]) -> np.ndarray:
+        """
+        Update market conditions and consumer choices.
+        
+        Returns:
+            Policies sold as an (n_companies, n_lines) array, player first, in line ordinal order
+            (the same counts written to each company's policies_sold)
+        """
+        companies = [player_company] + list(ai_competitors)
+        names = [company.name for company in companies]
+        policies_sold = np.empty((len(companies), len(self.line_names)), dtype=np.int64)
+        
+        # Premium rates and advertising budgets of every company on every line,
+        # as (n_lines, n_companies) arrays built once per turn
+        line_names = self.line_names
+        rates = np.column_stack([company.premium_rate_array(line_names, self.base_rate_array) for company in companies])
+        budgets = [advertising_budgets.get(name, {}) for name in names]
+        advertising = np.array([[budget.get(line_id, 0) for budget in budgets] for line_id in line_names], dtype=np.float64)
+        
+        for line_index, (line_id, line_rates, line_advertising) in enumerate(zip(line_names, rates, advertising)):
             # Update consumer choices and demand
-            new_policies = segment.update_demand(company_rates, line_advertising)
+            segment = self.market_segments[line_id]
+            new_policies = segment.update_demand_arrays(names, line_rates, line_advertising, self.rng)
+            policies_sold[:, line_index] = new_policies
             
             # Update policies for all companies
-            player_company.policies_sold[line_id] = new_policies[player_company.name]
-            for competitor in ai_competitors:
-                competitor.policies_sold[line_id] = new_policies[competitor.name]
+            for company, policies in zip(companies, new_policies.tolist()):
+                company.policies_sold[line_id] = policies
             
             # Update segment demand
-            segment.current_demand = sum(new_policies.values())
+            segment.current_demand = int(new_policies.sum())
+        
+        return policies_sold
     
     def get_claim_distribution(self, line_id: str) -> Dict:
         """Get claim distribution parameters for a specific line."""
-        state_id = line_id.split("_")[0]
-        state_info = self.states[state_id]
+        return self.claim_distributions[line_id]
+    
+    def _build_claim_distribution(self, line_id: str) -> Dict:
+        """Build claim distribution parameters for a specific line."""
+        state_info = self.states[self.line_to_state[line_id]]
         
-        if "_home" in line_id:
+        if self.line_is_home[line_id]:
             return {
-                "mean": np.log(24000),  # Average home claim $24,000
+                "mean": math.log(24000),  # Average home claim $24,000
                 "sigma": 0.7,           # Higher variation in home claims
                 "cat_mean": state_info["cat_severity"],  # Catastrophe severity
                 "cat_risk": state_info["catastrophe_risk"]  # Catastrophe frequency
             }
         else:  # Auto insurance
             return {
-                "mean": np.log(6000),   # Average auto claim $6,000
+                "mean": math.log(6000),   # Average auto claim $6,000
                 "sigma": 0.5            # Lower variation in auto claims
             }
     
+    def roll_catastrophes(self) -> np.ndarray:
+        """
+        Roll this quarter's catastrophes for every state at once.
+        
+        Returns:
+            The share of each line's policies hit by a catastrophe, in line ordinal order
+            (zero for auto lines and for states without a catastrophe)
+        """
+        n_states = len(self.state_names)
+        occurred = self._roll_state_catastrophes()
+        
+        # A catastrophe affects 10-30% of the home policies in its state, for every insurer alike
+        affected = np.where(occurred, self.rng.uniform(0.1, 0.3, n_states), 0.0)
+        return np.where(self.line_is_home_array, affected[self.line_state_index], 0.0)
+    
+    def _roll_state_catastrophes(self) -> np.ndarray:
+        """Return whether a catastrophe occurs in each state this quarter, in state ordinal order."""
+        return self.rng.random(len(self.state_names)) < self.quarterly_cat_risk
+    
+    def generate_catastrophes(self) -> Dict[str, bool]:
+        """Check which states have a catastrophe this quarter, with one draw for all of them."""
+        return dict(zip(self.state_names, self._roll_state_catastrophes().tolist()))
+    
     def generate_catastrophe(self, state_id: str) -> bool:
         """Check if a catastrophe occurs in the given state this quarter."""
-        quarterly_risk = self.states[state_id]["catastrophe_risk"] / 4
-        return np.random.random() < quarterly_risk 
\ No newline at end of file
+        return bool(self.rng.random() < self.quarterly_cat_risk[self.state_ids[state_id]])
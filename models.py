@@ -1,23 +1,40 @@
 from dataclasses import dataclass, asdict
 from typing import List, Dict, Any, Optional, Union
+import math
 import numpy as np
 
-@dataclass
+from data.models.claims import ClaimsLedger
+
+@dataclass(slots=True)
 class Company:
     """Represents an insurance company in the game."""
+    
     name: str
     cash: float
     investments: Dict[str, int]  # Changed to store number of shares for each asset
     policies_sold: Dict[str, int]
-    claims_history: List[Dict[str, Any]]
+    claims_history: ClaimsLedger  # A list of claim dicts is converted on construction
     premium_rates: Dict[str, float]
     advertising_budget: Dict[str, float]  # New: advertising budget per line
     
+    def __post_init__(self):
+        self.claims_history = ClaimsLedger.from_dict(self.claims_history)
+    
     def calculate_revenue(self) -> float:
         """Calculate total revenue from premiums."""
         return sum(self.premium_rates[market] * count 
                   for market, count in self.policies_sold.items())
     
+    def premium_rate_array(self, line_names, base_rates: np.ndarray) -> np.ndarray:
+        """Return premium rates in line ordinal order, using the base rate for unpriced lines."""
+        rates = self.premium_rates
+        return np.array([rates.get(line_id, base_rate) for line_id, base_rate in zip(line_names, base_rates.tolist())])
+    
+    def policies_array(self, line_names) -> np.ndarray:
+        """Return policies sold in line ordinal order."""
+        policies = self.policies_sold
+        return np.array([policies.get(line_id, 0) for line_id in line_names], dtype=np.int64)
+    
     def process_claims(self, claims: List[Dict[str, Any]]) -> float:
         """Process and pay claims, return total amount paid."""
         total_claims = sum(claim["amount"] for claim in claims)
@@ -25,6 +42,12 @@ class Company:
         self.claims_history.extend(claims)
         return total_claims
     
+    def pay_claims(self, line_id: str, amounts: np.ndarray, turn: int, claim_type: str = "regular") -> float:
+        """Pay an array of claims on one line, return total amount paid."""
+        total_claims = self.claims_history.append(line_id, amounts, turn, claim_type)
+        self.cash -= total_claims
+        return total_claims
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert company object to a dictionary for serialization."""
         return {
@@ -32,7 +55,7 @@ class Company:
             "cash": self.cash,
             "investments": self.investments,
             "policies_sold": self.policies_sold,
-            "claims_history": self.claims_history,
+            "claims_history": self.claims_history.to_dict(),
             "premium_rates": self.premium_rates,
             "advertising_budget": self.advertising_budget
         }
@@ -72,7 +95,8 @@ class AICompetitor(Company):
             advertising_budget={}
         )
         self.risk_profile = risk_profile
-        self.financial_history = []
+        self.financial_history = FinancialHistory()
+        self._price_bounds = None  # (market, undercut_rates, min_rates), see _get_price_bounds
         
         # Set target market share and strategy parameters based on risk profile
         if risk_profile == "aggressive":
@@ -99,48 +123,58 @@ class AICompetitor(Company):
         self._update_advertising(game_state)
         self._make_investments(game_state)
     
+    def _get_price_bounds(self, market) -> tuple:
+        """
+        Return this competitor's undercut and minimum rates per line.
+        
+        Both depend only on the base rates and the risk profile, so they are
+        computed once per market and reused every turn.
+        """
+        bounds = self._price_bounds
+        if bounds is None or bounds[0] is not market:
+            base_rates = market.base_rate_array
+            undercut_rates = base_rates * (1 - 0.1 * self.price_sensitivity)  # Up to 10-15% below base rate
+            min_rates = base_rates * 0.85  # Don't go below 85% of base rate
+            bounds = self._price_bounds = (market, undercut_rates, min_rates)
+        return bounds[1], bounds[2]
+    
     def _update_pricing(self, game_state) -> None:
         """Update premium rates based on market conditions and strategy."""
-        for line_id, segment in game_state.market.market_segments.items():
-            if line_id not in self.premium_rates:
-                # Initialize with base market rate if no rate set
-                self.premium_rates[line_id] = game_state.market.base_market_rates[line_id]
-                continue
-            
-            # Get market data
-            base_rate = game_state.market.base_market_rates[line_id]
-            player_rate = game_state.player_company.premium_rates.get(line_id, base_rate)
-            current_policies = self.policies_sold.get(line_id, 0)
-            market_share = current_policies / segment.market_size if segment.market_size > 0 else 0
-            
-            # Calculate target rate based on strategy
-            if market_share < self.target_market_share:
-                # Undercut to gain market share
-                target_rate = min(
-                    player_rate * 0.95,  # 5% below player
-                    base_rate * (1 - 0.1 * self.price_sensitivity)  # Up to 10-15% below base rate
-                )
-            else:
-                # Maintain or increase rates
-                target_rate = max(
-                    base_rate,
-                    player_rate * 1.02  # Slightly above player
-                )
-            
-            # Ensure minimum profitability
-            min_rate = base_rate * 0.85  # Don't go below 85% of base rate
-            target_rate = max(target_rate, min_rate)
-            
-            # Gradually adjust rates (max 10% change per turn)
-            current_rate = self.premium_rates[line_id]
-            max_change = current_rate * 0.1
-            new_rate = np.clip(
-                target_rate,
-                current_rate - max_change,
-                current_rate + max_change
-            )
-            
-            self.premium_rates[line_id] = new_rate
+        # Work on all lines at once, in line ordinal order
+        market = game_state.market
+        line_names = market.line_names
+        base_rates = market.base_rate_array
+        undercut_rates, min_rates = self._get_price_bounds(market)
+        player_rates = game_state.player_company.premium_rate_array(line_names, base_rates)
+        current_rates = self.premium_rate_array(line_names, base_rates)
+        market_sizes = market.market_size_array
+        market_share = np.divide(
+            self.policies_array(line_names), market_sizes,
+            out=np.zeros(len(line_names)), where=market_sizes > 0
+        )
+        
+        # Calculate target rate based on strategy, without branching per line
+        target_rates = np.where(
+            market_share < self.target_market_share,
+            # Undercut to gain market share: 5% below player, down to the undercut rate
+            np.minimum(player_rates * 0.95, undercut_rates),
+            # Maintain or increase rates: slightly above player
+            np.maximum(base_rates, player_rates * 1.02)
+        )
+        
+        # Ensure minimum profitability
+        target_rates = np.maximum(target_rates, min_rates)
+        
+        # Gradually adjust rates (max 10% change per turn)
+        new_rates = np.clip(target_rates, current_rates * 0.9, current_rates * 1.1)
+        
+        # Lines without a rate yet are initialized with the base market rate
+        if len(self.premium_rates) < len(line_names):
+            has_rate = np.fromiter((line_id in self.premium_rates for line_id in line_names), dtype=bool, count=len(line_names))
+            new_rates = np.where(has_rate, new_rates, base_rates)
+        
+        # Write all rates back in one update
+        self.premium_rates.update(zip(line_names, new_rates.tolist()))
     
     def _update_advertising(self, game_state) -> None:
         """Update advertising budgets based on strategy and market conditions."""
@@ -150,9 +184,17 @@ class AICompetitor(Company):
             revenue = policies * self.premium_rates.get(line_id, game_state.market.base_market_rates[line_id])
             revenue_by_line[line_id] = revenue
         
+        # Cap advertising at 25% of cash
+        max_budget = self.cash * 0.25
+        
         for line_id, segment in game_state.market.market_segments.items():
-            # Base advertising on revenue and strategy
             revenue = revenue_by_line.get(line_id, 0)
+            if revenue <= 0:
+                # Minimal presence in new markets
+                self.advertising_budget[line_id] = min(5000, max_budget)
+                continue
+            
+            # Base advertising on revenue and strategy
             base_budget = revenue * self.advertising_ratio
             
             # Adjust based on market share
@@ -167,15 +209,9 @@ class AICompetitor(Company):
                 budget = base_budget * 0.8
             
             # Ensure minimum advertising in active markets
-            if revenue > 0:
-                budget = max(budget, 10000)  # Minimum $10k per line
-            else:
-                budget = 5000  # Minimal presence in new markets
-            
-            # Cap advertising at 25% of cash
-            budget = min(budget, self.cash * 0.25)
+            budget = max(budget, 10000)  # Minimum $10k per line
             
-            self.advertising_budget[line_id] = budget
+            self.advertising_budget[line_id] = min(budget, max_budget)
     
     def _make_investments(self, game_state) -> None:
         """Make investment decisions."""
@@ -199,41 +235,51 @@ class AICompetitor(Company):
         )
         competitor.investments = data["investments"]
         competitor.policies_sold = data["policies_sold"]
-        competitor.claims_history = data["claims_history"]
+        competitor.claims_history = ClaimsLedger.from_dict(data["claims_history"])
         competitor.premium_rates = data["premium_rates"]
         competitor.advertising_budget = data["advertising_budget"]
         return competitor
 
-@dataclass
+@dataclass(slots=True)
 class MarketSegment:
     """Represents a market segment with specific risk characteristics."""
+    
     name: str
     base_risk: float
     price_sensitivity: float
     market_size: int
     current_demand: int
     
-    def calculate_demand(self, premium: float, competitor_premiums: List[float]) -> int:
-        """Calculate demand based on premium pricing and competition."""
-        relative_price = premium / np.mean(competitor_premiums) if competitor_premiums else 1.0
-        demand_factor = np.exp(-self.price_sensitivity * (relative_price - 1))
+    def calculate_demand(self, premium: float, competitor_mean: float) -> int:
+        """Calculate demand based on premium pricing relative to the mean market premium."""
+        relative_price = premium / competitor_mean if competitor_mean else 1.0
+        demand_factor = math.exp(-self.price_sensitivity * (relative_price - 1))
         return int(min(self.market_size, self.current_demand * demand_factor))
 
-@dataclass
+@dataclass(slots=True)
 class FinancialReport:
     """Represents a company's financial report for a given period."""
+    
     period: int
     revenue: float
     claims_paid: float
     investment_returns: float  # Realized returns (dividends/interest)
     unrealized_gains: float   # Unrealized capital gains/losses
     operating_expenses: float
+    cash: float               # Cash on hand at the end of the period
+    investment_value: float   # Market value of investments at the end of the period
+    policies_by_line: Dict[str, int]
     
     @property
     def net_income(self) -> float:
         """Calculate net income for the period (excluding unrealized gains)."""
         return self.revenue + self.investment_returns - self.claims_paid - self.operating_expenses
     
+    @property
+    def total_assets(self) -> float:
+        """Cash plus investments at the end of the period."""
+        return self.cash + self.investment_value
+    
     def generate_summary(self) -> Dict[str, Union[int, float]]:
         """Generate a summary of the financial report."""
         return {
@@ -254,13 +300,103 @@ class FinancialReport:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'FinancialReport':
         """Create a financial report from a dictionary."""
-        return cls(**data)
+        # Reports saved before the balance sheet and policy counts were recorded lack them
+        return cls(**{"cash": 0.0, "investment_value": 0.0, "policies_by_line": {}, **data})
+
+FINANCIAL_REPORT_DTYPE = np.dtype([
+    ("period", np.int32),
+    ("revenue", np.float64),
+    ("claims_paid", np.float64),
+    ("investment_returns", np.float64),
+    ("unrealized_gains", np.float64),
+    ("operating_expenses", np.float64),
+    ("cash", np.float64),
+    ("investment_value", np.float64)
+])
+
+class FinancialHistory:
+    """
+    A company's financial reports stored in a preallocated structured array.
+    
+    Behaves like a list of FinancialReport (len, indexing, iteration), building
+    report objects only when they are accessed. `records` exposes the filled
+    part of the array for vectorized analysis, e.g. records["revenue"].sum().
+    Policy counts are kept in a separate (reports, lines) array, `policies`,
+    with a column for each line in `line_names` (added as reports name them).
+    """
+    
+    def __init__(self, capacity: int = 64):
+        self._records = np.zeros(capacity, dtype=FINANCIAL_REPORT_DTYPE)
+        self._policies = np.zeros((capacity, 0), dtype=np.int64)
+        self._line_index: Dict[str, int] = {}
+        self._size = 0
+    
+    @property
+    def records(self) -> np.ndarray:
+        """Structured array view of all recorded reports, oldest first."""
+        return self._records[:self._size]
+    
+    @property
+    def policies(self) -> np.ndarray:
+        """Policies sold per report and line (columns in line_names order)."""
+        return self._policies[:self._size]
+    
+    @property
+    def line_names(self) -> tuple:
+        """Lines with a column in `policies`, in column order."""
+        return tuple(self._line_index)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._to_report(i) for i in range(self._size)[index]]
+        return self._to_report(range(self._size)[index])
+    
+    def __iter__(self):
+        return (self._to_report(i) for i in range(self._size))
+    
+    def append(self, report: FinancialReport) -> None:
+        """Record a report at the end of the history."""
+        if self._size == len(self._records):
+            self._records = np.resize(self._records, len(self._records) * 2)
+            self._policies = np.pad(self._policies, ((0, len(self._records) - len(self._policies)), (0, 0)))
+        self._records[self._size] = (
+            report.period,
+            report.revenue,
+            report.claims_paid,
+            report.investment_returns,
+            report.unrealized_gains,
+            report.operating_expenses,
+            report.cash,
+            report.investment_value
+        )
+        
+        # Give lines seen for the first time a column (zero in earlier reports)
+        new_lines = [line_id for line_id in report.policies_by_line if line_id not in self._line_index]
+        if new_lines:
+            for line_id in new_lines:
+                self._line_index[line_id] = len(self._line_index)
+            self._policies = np.pad(self._policies, ((0, 0), (0, len(new_lines))))
+        for line_id, count in report.policies_by_line.items():
+            self._policies[self._size, self._line_index[line_id]] = count
+        self._size += 1
+    
+    def _to_report(self, index: int) -> FinancialReport:
+        """Build a FinancialReport from the record and policy counts at one position."""
+        return FinancialReport(
+            *self._records[index].tolist(),
+            policies_by_line=dict(zip(self._line_index, self._policies[index].tolist()))
+        )
 
 class GameState:
     """Manages the overall game state and progression."""
     
-    def __init__(self, initial_state="CA", company_name="Player Insurance Co."):
+    def __init__(self, initial_state="CA", company_name="Player Insurance Co.", seed=None):
         self.current_turn = 0
+        # All game randomness comes from one generator so a seed makes runs reproducible
+        self.rng = np.random.default_rng(seed)
         self.player_company = Company(
             name=company_name,
             cash=1000000.0,  # Starting with $1M
@@ -305,13 +441,13 @@ class GameState:
                 for competitor in self.ai_competitors:
                     all_rates.append(competitor.premium_rates.get(line_id, self.base_market_rates[line_id]))
                 
-                # Calculate market share for player
+                # Calculate market share for player (against the mean rate, computed once per line)
+                mean_rate = sum(all_rates) / len(all_rates)
                 player_premium = self.player_company.premium_rates.get(line_id, self.base_market_rates[line_id])
-                relative_price = player_premium / np.mean(all_rates)
-                potential_policies = segment.calculate_demand(player_premium, all_rates)
+                potential_policies = segment.calculate_demand(player_premium, mean_rate)
                 
                 # Add random variation (±10%)
-                variation = np.random.uniform(0.9, 1.1)
+                variation = self.rng.uniform(0.9, 1.1)
                 new_policies[line_id] = int(potential_policies * variation)
                 
                 # Update AI competitor policies
@@ -319,7 +455,7 @@ class GameState:
                 if remaining_demand > 0:
                     for competitor in self.ai_competitors:
                         competitor_premium = competitor.premium_rates.get(line_id, self.base_market_rates[line_id])
-                        competitor_demand = segment.calculate_demand(competitor_premium, all_rates)
+                        competitor_demand = segment.calculate_demand(competitor_premium, mean_rate)
                         competitor_policies = int(min(competitor_demand, remaining_demand / len(self.ai_competitors)))
                         competitor.policies_sold[line_id] = competitor_policies
                         remaining_demand -= competitor_policies
@@ -359,12 +495,12 @@ class GameState:
             
             # Calculate quarterly claim frequency (divide annual risk by 4)
             quarterly_risk = base_risk / 4
-            claim_count = np.random.poisson(quarterly_risk * policies)
+            claim_count = self.rng.poisson(quarterly_risk * policies)
             
             # Generate regular claims
             dist = self.claim_distributions[line_id]
             for _ in range(claim_count):
-                claim_amount = np.random.lognormal(
+                claim_amount = self.rng.lognormal(
                     mean=dist["mean"],
                     sigma=dist["sigma"]
                 )
@@ -381,13 +517,13 @@ class GameState:
                 state_id = line_id.split("_")[0]
                 cat_risk = self.states[state_id]["catastrophe_risk"] / 4  # Quarterly risk
                 
-                if np.random.random() < cat_risk:  # Catastrophe occurs
+                if self.rng.random() < cat_risk:  # Catastrophe occurs
                     # Affect 10-30% of policies in the state
-                    affected_ratio = np.random.uniform(0.1, 0.3)
+                    affected_ratio = self.rng.uniform(0.1, 0.3)
                     affected_policies = int(policies * affected_ratio)
                     
                     for _ in range(affected_policies):
-                        claim_amount = np.random.lognormal(
+                        claim_amount = self.rng.lognormal(
                             mean=dist["cat_mean"],
                             sigma=0.5  # Less variation in catastrophe claims
                         )
@@ -433,6 +569,7 @@ class GameState:
         
         # Set basic attributes
         game_state.current_turn = data["current_turn"]
+        game_state.rng = np.random.default_rng()
         game_state.player_company = Company.from_dict(data["player_company"])
         game_state.ai_competitors = [AICompetitor.from_dict(comp) for comp in data["ai_competitors"]]
         
@@ -442,10 +579,11 @@ class GameState:
             game_state.market_segments[key] = MarketSegment(**seg_data)
         
         # Reconstruct investment assets
-        from asset import Asset
+        from asset import Asset, AssetPool
+        asset_pool = AssetPool(capacity=max(len(data["investment_assets"]), 1), rng=game_state.rng)
         game_state.investment_assets = {}
         for name, asset_data in data["investment_assets"].items():
-            game_state.investment_assets[name] = Asset(**asset_data)
+            game_state.investment_assets[name] = Asset(**asset_data, pool=asset_pool)
         
         # Set other attributes
         game_state.states = data["states"]
@@ -3,7 +3,7 @@ from typing import Dict, Any, List, Tuple, Optional
 import numpy as np
 import math
 
-from state.game_state import GameState
+from state.game_state import GameState, line_state
 from data.models.market_segment import MarketSegment
 
 class MarketService:
@@ -21,10 +21,34 @@ class MarketService:
             "auto": [1.1, 0.9, 1.0, 1.2],  # More auto claims in winter and fall
             "home": [1.2, 0.9, 0.8, 1.1]   # More home claims in winter
         }
+        self._segment_arrays = None  # Per-segment arrays for update_market_demand, built on first use
     
     def set_game_state(self, game_state: GameState) -> None:
         """Set the game state reference."""
         self._game_state = game_state
+        self._segment_arrays = None
+    
+    def _get_segment_arrays(self) -> Tuple[List[MarketSegment], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the market segments with their sizes, state growth rates and
+        seasonal factors (one row of four quarters per segment) as arrays.
+        
+        The arrays are rebuilt when the set of market segments changes.
+        """
+        market_segments = self._game_state.market_segments
+        if self._segment_arrays is None or len(self._segment_arrays[0]) != len(market_segments):
+            segments = list(market_segments.values())
+            market_sizes = np.array([segment.market_size for segment in segments], dtype=np.float64)
+            growth_rates = np.array([
+                self._game_state.states[line_state(line_id)]["growth_rate"]
+                for line_id in market_segments
+            ])
+            seasonal_factors = np.array([
+                self._seasonal_effects["auto" if "_auto" in line_id else "home"]
+                for line_id in market_segments
+            ])
+            self._segment_arrays = (segments, market_sizes, growth_rates, seasonal_factors)
+        return self._segment_arrays
     
     def update_market_demand(self) -> None:
         """
@@ -45,27 +69,20 @@ class MarketService:
         # Get current quarter (0-3)
         current_quarter = self._game_state.current_turn % 4
         
-        # Update each market segment
-        for line_id, segment in self._game_state.market_segments.items():
-            # Get line type (auto or home)
-            line_type = "auto" if "_auto" in line_id else "home"
-            
-            # Get state
-            state_id = line_id.split("_")[0]
-            state_data = self._game_state.states[state_id]
-            
-            # Calculate seasonal effect
-            seasonal_factor = self._seasonal_effects[line_type][current_quarter]
-            
-            # Calculate growth factor based on state growth rate
-            turns_passed = self._game_state.current_turn / 4  # Years
-            growth_factor = (1 + state_data["growth_rate"]) ** turns_passed
-            
-            # Calculate base market size with long-term growth
-            base_size = segment.market_size * growth_factor
-            
-            # Apply economic cycle and seasonal effects to demand (not size)
-            segment.current_demand = int(base_size * economic_factor * seasonal_factor)
+        # Update all market segments at once
+        segments, market_sizes, growth_rates, seasonal_factors = self._get_segment_arrays()
+        
+        # Calculate growth factor based on state growth rate
+        turns_passed = self._game_state.current_turn / 4  # Years
+        growth_factors = (1 + growth_rates) ** turns_passed
+        
+        # Calculate base market size with long-term growth
+        base_sizes = market_sizes * growth_factors
+        
+        # Apply economic cycle and seasonal effects to demand (not size)
+        demand = (base_sizes * economic_factor * seasonal_factors[:, current_quarter]).astype(np.int64)
+        for segment, segment_demand in zip(segments, demand.tolist()):
+            segment.current_demand = segment_demand
     
     def calculate_market_share(self, line_id: str) -> Dict[str, float]:
         """
@@ -158,7 +175,7 @@ class MarketService:
         
         for line_id, segment in self._game_state.market_segments.items():
             # Skip if state is not unlocked
-            state_id = line_id.split("_")[0]
+            state_id = line_state(line_id)
             if not self._game_state.unlocked_states.get(state_id, False):
                 continue
                 
@@ -1,17 +1,26 @@
 # nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
 from typing import Dict, List, Any
+from functools import lru_cache
 import numpy as np
 
 from data.models.company import Company
 from data.models.ai_competitor import AICompetitor
 from data.models.market_segment import MarketSegment
 from data.models.financial_report import FinancialReport
+from claims_kernel import sample_claims
+
+@lru_cache(maxsize=None)
+def line_state(line_id: str) -> str:
+    """Return the state id of a line id like "CA_home"."""
+    return line_id.split("_")[0]
 
 class GameState:
     """Manages the overall game state and progression."""
     
-    def __init__(self, initial_state="CA", company_name="Player Insurance Co."):
+    def __init__(self, initial_state="CA", company_name="Player Insurance Co.", seed=None):
         self.current_turn = 0
+        # All game randomness comes from one generator so a seed makes runs reproducible
+        self.rng = np.random.default_rng(seed)
         self.player_company = Company(
             name=company_name,
             cash=1000000.0,  # Starting with $1M
@@ -37,6 +46,7 @@ class GameState:
         self.claim_distributions = {}
         self.unlocked_states = {}
         self.financial_history = []
+        self._claim_params = {}  # Per-line claim parameter arrays, keyed by the tuple of line ids
     
     def update(self):
         """Update game state for the current turn."""
@@ -56,7 +66,7 @@ class GameState:
         new_policies = {}
         
         for line_id, segment in self.market_segments.items():
-            state_id = line_id.split("_")[0]
+            state_id = line_state(line_id)
             # Only update policies for unlocked states
             if self.unlocked_states[state_id]:
                 # Get all companies' premium rates for this line
@@ -65,13 +75,13 @@ class GameState:
                 for competitor in self.ai_competitors:
                     all_rates.append(competitor.premium_rates.get(line_id, self.base_market_rates[line_id]))
                 
-                # Calculate market share for player
+                # Calculate market share for player (against the mean rate, computed once per line)
+                mean_rate = sum(all_rates) / len(all_rates)
                 player_premium = self.player_company.premium_rates.get(line_id, self.base_market_rates[line_id])
-                relative_price = player_premium / np.mean(all_rates)
-                potential_policies = segment.calculate_demand(player_premium, all_rates)
+                potential_policies = segment.calculate_demand(player_premium, mean_rate)
                 
                 # Add random variation (±10%)
-                variation = np.random.uniform(0.9, 1.1)
+                variation = self.rng.uniform(0.9, 1.1)
                 new_policies[line_id] = int(potential_policies * variation)
                 
                 # Update AI competitor policies
@@ -79,7 +89,7 @@ class GameState:
                 if remaining_demand > 0:
                     for competitor in self.ai_competitors:
                         competitor_premium = competitor.premium_rates.get(line_id, self.base_market_rates[line_id])
-                        competitor_demand = segment.calculate_demand(competitor_premium, all_rates)
+                        competitor_demand = segment.calculate_demand(competitor_premium, mean_rate)
                         competitor_policies = int(min(competitor_demand, remaining_demand / len(self.ai_competitors)))
                         competitor.policies_sold[line_id] = competitor_policies
                         remaining_demand -= competitor_policies
@@ -110,56 +120,58 @@ class GameState:
         # Add premium revenue to cash
         company.cash += premium_revenue
         
-        claims = []
-        
-        # Generate regular claims
-        for line_id, policies in company.policies_sold.items():
-            segment = self.market_segments[line_id]
-            base_risk = segment.base_risk
-            
-            # Calculate quarterly claim frequency (divide annual risk by 4)
-            quarterly_risk = base_risk / 4
-            claim_count = np.random.poisson(quarterly_risk * policies)
-            
-            # Generate regular claims
-            dist = self.claim_distributions[line_id]
-            for _ in range(claim_count):
-                claim_amount = np.random.lognormal(
-                    mean=dist["mean"],
-                    sigma=dist["sigma"]
-                )
-                
-                claims.append({
-                    "line": line_id,
-                    "amount": claim_amount,
-                    "turn": self.current_turn,
-                    "type": "regular"
-                })
-            
-            # Generate catastrophe claims for home insurance
-            if "_home" in line_id:  # Only home insurance has catastrophe risk
-                state_id = line_id.split("_")[0]
-                cat_risk = self.states[state_id]["catastrophe_risk"] / 4  # Quarterly risk
-                
-                if np.random.random() < cat_risk:  # Catastrophe occurs
-                    # Affect 10-30% of policies in the state
-                    affected_ratio = np.random.uniform(0.1, 0.3)
-                    affected_policies = int(policies * affected_ratio)
-                    
-                    for _ in range(affected_policies):
-                        claim_amount = np.random.lognormal(
-                            mean=dist["cat_mean"],
-                            sigma=0.5  # Less variation in catastrophe claims
-                        )
-                        
-                        claims.append({
-                            "line": line_id,
-                            "amount": claim_amount,
-                            "turn": self.current_turn,
-                            "type": "catastrophe"
-                        })
-        
-        company.process_claims(claims)
+        turn = self.current_turn
+        line_ids = tuple(company.policies_sold)
+        policies = np.fromiter(company.policies_sold.values(), dtype=np.int64, count=len(line_ids))
+        claim_rates, means, sigmas, cat_means, cat_risks = self._get_claim_params(line_ids)
+        
+        # Catastrophes only hit home insurance, affecting 10-30% of policies in the state
+        cat_counts = np.zeros(len(line_ids), dtype=np.int64)
+        for i, cat_risk in enumerate(cat_risks):
+            if cat_risk > 0 and self.rng.random() < cat_risk:  # Catastrophe occurs
+                affected_ratio = self.rng.uniform(0.1, 0.3)
+                cat_counts[i] = int(policies[i] * affected_ratio)
+        
+        # Sample every line's claims in one kernel call
+        amounts, claim_counts = sample_claims(self.rng, claim_rates, policies, means, sigmas, cat_counts, cat_means)
+        
+        # Amounts hold each line's regular claims followed by its catastrophe claims;
+        # each batch is paid straight from the array into the company's columnar ledger
+        company.claims_history.reserve(len(amounts))
+        k = 0
+        for line_id, claim_count, cat_count in zip(line_ids, claim_counts.tolist(), cat_counts.tolist()):
+            company.pay_claims(line_id, amounts[k:k + claim_count], turn, "regular")
+            k += claim_count
+            company.pay_claims(line_id, amounts[k:k + cat_count], turn, "catastrophe")
+            k += cat_count
+    
+    def _get_claim_params(self, line_ids: tuple) -> tuple:
+        """
+        Return claim parameters for the given lines, in order.
+        
+        Segments, distributions and state risks don't change during a game, so the
+        arrays are built once per set of lines and reused every turn.
+        
+        Returns:
+            (claim_rates, means, sigmas, cat_means, cat_risks) where claim rates and
+            catastrophe risks are quarterly, and cat_risks is a list (0 for auto lines)
+        """
+        params = self._claim_params.get(line_ids)
+        if params is None:
+            dists = [self.claim_distributions[line_id] for line_id in line_ids]
+            params = (
+                # Quarterly frequency is a quarter of the annual risk
+                np.array([self.market_segments[line_id].base_risk / 4 for line_id in line_ids]),
+                np.array([dist["mean"] for dist in dists]),
+                np.array([dist["sigma"] for dist in dists]),
+                np.array([dist.get("cat_mean", 0.0) for dist in dists]),
+                [
+                    self.states[line_state(line_id)]["catastrophe_risk"] / 4 if "_home" in line_id else 0.0
+                    for line_id in line_ids
+                ],
+            )
+            self._claim_params[line_ids] = params
+        return params
     
     def _update_market_demand(self):
         """Update market demand based on economic cycle and seasonal factors."""
@@ -208,6 +220,7 @@ class GameState:
         
         # Set basic attributes
         game_state.current_turn = data["current_turn"]
+        game_state.rng = np.random.default_rng()
         game_state.player_company = Company.from_dict(data["player_company"])
         game_state.ai_competitors = [AICompetitor.from_dict(comp) for comp in data["ai_competitors"]]
         
@@ -217,10 +230,11 @@ class GameState:
             game_state.market_segments[key] = MarketSegment(**seg_data)
         
         # Reconstruct investment assets
-        from asset import Asset
+        from asset import Asset, AssetPool
+        asset_pool = AssetPool(capacity=max(len(data["investment_assets"]), 1), rng=game_state.rng)
         game_state.investment_assets = {}
         for name, asset_data in data["investment_assets"].items():
-            game_state.investment_assets[name] = Asset(**asset_data)
+            game_state.investment_assets[name] = Asset(**asset_data, pool=asset_pool)
         
         # Set other attributes
         game_state.states = data["states"]
@@ -230,5 +244,6 @@ class GameState:
         
         # Reconstruct financial history
         game_state.financial_history = [FinancialReport.from_dict(report) for report in data["financial_history"]]
+        game_state._claim_params = {}
         
         return game_state 
\ No newline at end of file
@@ -0,0 +1,115 @@
+# nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
+
+import asyncio
+import csv
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import analytics
+from analytics import FINANCIAL_FIELDS, MARKET_FIELDS
+from game_logic import GameState
+from models import FinancialReport
+
+@pytest.fixture
+def played_game(tmp_path, monkeypatch):
+    """A seeded game three turns in, with exports written under a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    game_state = GameState(seed=0)
+    game_state.player_company.investments["SP500"] = 10
+    for _ in range(3):
+        game_state.update()
+    return game_state
+
+def _read_csv(path):
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    return rows[0], rows[1:]
+
+def test_financial_export_has_a_policy_column_per_market_line(played_game):
+    header, rows = _read_csv(analytics.export_financial_data(played_game))
+    line_names = played_game.market.line_names
+    assert tuple(header) == FINANCIAL_FIELDS + tuple(f"policies_{line_id}" for line_id in line_names)
+    assert len(rows) == len(played_game.financial_history)
+
+def test_financial_export_fills_balance_sheet_and_policy_columns(played_game):
+    header, rows = _read_csv(analytics.export_financial_data(played_game))
+    for row, report in zip(rows, played_game.financial_history):
+        values = dict(zip(header, row))
+        assert float(values["cash"]) == pytest.approx(report.cash, abs=0.01)
+        assert float(values["investment_value"]) == pytest.approx(report.investment_value, abs=0.01)
+        assert float(values["total_assets"]) == pytest.approx(report.total_assets, abs=0.01)
+        for line_id, count in report.policies_by_line.items():
+            assert int(values[f"policies_{line_id}"]) == count
+
+def test_financial_export_keeps_every_line_from_plain_report_lists(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reports = [
+        FinancialReport(0, 100.0, 40.0, 5.0, 0.0, 10.0, 1000.0, 50.0, {"CA_auto": 3, "TX_home": 4}),
+        FinancialReport(1, 120.0, 30.0, 5.0, 0.0, 10.0, 1100.0, 50.0, {"CA_auto": 5, "NY_auto": 6})
+    ]
+    header, rows = _read_csv(analytics.export_financial_data(SimpleNamespace(financial_history=reports)))
+    assert header[len(FINANCIAL_FIELDS):] == ["policies_CA_auto", "policies_TX_home", "policies_NY_auto"]
+    assert [row[len(FINANCIAL_FIELDS):] for row in rows] == [["3", "4", "0"], ["5", "0", "6"]]
+    assert float(dict(zip(header, rows[0]))["total_assets"]) == 1050.0
+
+def test_market_export_lists_each_company_once_per_line(played_game):
+    header, rows = _read_csv(analytics.export_market_data(played_game))
+    assert tuple(header) == MARKET_FIELDS
+    
+    unlocked_lines = {line_id for line_id in played_game.market.line_names
+                      if played_game.unlocked_states[played_game.line_to_state[line_id]]}
+    companies = [company.name for company in played_game.companies]
+    by_line = {}
+    for row in rows:
+        values = dict(zip(MARKET_FIELDS, row))
+        by_line.setdefault(values["line_id"], []).append(values)
+    
+    assert set(by_line) == unlocked_lines
+    for line_rows in by_line.values():
+        assert [values["company"] for values in line_rows] == companies
+        assert sum(float(values["market_share"]) for values in line_rows) == pytest.approx(1.0, abs=0.02)
+
+@pytest.fixture
+def event_log(tmp_path, monkeypatch):
+    """Empty local event columns writing to a fresh session file, timed by a settable clock."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(analytics, "IS_BROWSER", False)
+    monkeypatch.setattr(analytics, "_events_filename", None)
+    monkeypatch.setattr(analytics, "local_events", {field: [] for field in analytics.EVENT_FIELDS})
+    analytics.local_events["timestamp"] = analytics.array("d")
+    now = [1000.0]
+    monkeypatch.setattr(analytics, "_frame_time", None)
+    analytics.set_clock(lambda: now[0])
+    yield now
+    analytics.set_clock(time.time)
+
+def test_tracking_never_writes_and_flush_timing_follows_the_clock(event_log, tmp_path):
+    for _ in range(analytics.FLUSH_EVERY_EVENTS - 1):
+        analytics.track_event("test", "click")
+    assert not analytics.flush_due()
+    
+    event_log[0] += analytics.FLUSH_INTERVAL_SECONDS
+    assert analytics.flush_due()
+    assert not (tmp_path / "analytics").exists()
+    
+    event_log[0] -= analytics.FLUSH_INTERVAL_SECONDS
+    analytics.track_event("test", "click")
+    assert analytics.flush_due()
+
+def test_async_flush_appends_batches_to_one_session_file(event_log, tmp_path):
+    analytics.track_event("test", "first", value=1)
+    asyncio.run(analytics.flush_local_events_async())
+    assert analytics.local_event_count() == 0
+    assert not analytics.flush_due()
+    
+    event_log[0] += 5
+    analytics.track_pageview("market")
+    analytics.save_local_events()
+    
+    files = list((tmp_path / "analytics").iterdir())
+    assert len(files) == 1
+    header, rows = _read_csv(files[0])
+    assert tuple(header) == analytics.EVENT_FIELDS
+    assert [(row[0], row[3], float(row[-1])) for row in rows] == [("event", "first", 1000.0), ("pageview", "", 1005.0)]
@@ -0,0 +1,67 @@
+# nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
+
+import numpy as np
+import pytest
+
+from asset import Asset, AssetPool, MAX_PRICE_HISTORY
+
+def _grow_prices(pool, count):
+    """Apply `count` +1% returns to every asset, returning the expected price path of asset 0."""
+    prices = [float(pool.current_price[0])]
+    for _ in range(count):
+        pool.apply_returns(np.full(pool.size, 0.01))
+        prices.append(float(pool.current_price[0]))
+    return prices
+
+def test_history_grows_in_order_before_wrapping():
+    pool = AssetPool(history_capacity=4, rng=np.random.default_rng(0))
+    pool.add(100.0, 0.02, 0.1)
+    prices = _grow_prices(pool, 10)
+    
+    np.testing.assert_allclose(pool.get_history(0), prices)
+    assert pool.history.shape[1] == 16
+
+def test_history_keeps_only_the_most_recent_samples_after_wrapping():
+    pool = AssetPool(history_capacity=MAX_PRICE_HISTORY, rng=np.random.default_rng(0))
+    pool.add(1.0, 0.02, 0.1)
+    pool.add(2.0, 0.02, 0.1)
+    prices = _grow_prices(pool, MAX_PRICE_HISTORY + 10)
+    
+    history = pool.get_history(0)
+    assert len(history) == MAX_PRICE_HISTORY
+    assert pool.history.shape[1] == MAX_PRICE_HISTORY
+    np.testing.assert_allclose(history, prices[-MAX_PRICE_HISTORY:])
+    assert history[-1] == pool.current_price[0]
+    np.testing.assert_allclose(pool.get_history(1), 2 * np.array(prices[-MAX_PRICE_HISTORY:]))
+
+def test_history_is_read_only():
+    pool = AssetPool(rng=np.random.default_rng(0))
+    pool.add(100.0, 0.02, 0.1)
+    with pytest.raises(ValueError):
+        pool.get_history(0)[0] = 1.0
+
+def test_adding_past_capacity_keeps_asset_state():
+    pool = AssetPool(capacity=1, rng=np.random.default_rng(0))
+    assets = [Asset(f"A{i}", 10.0 * (i + 1), 0.01, 0.1, pool=pool) for i in range(3)]
+    pool.update_prices()
+    
+    assert pool.size == 3
+    for i, asset in enumerate(assets):
+        assert asset.previous_price == 10.0 * (i + 1)
+        assert len(asset.price_history) == 2
+        assert asset.price_history[-1] == asset.current_price
+
+def test_assets_require_a_pool():
+    with pytest.raises(TypeError):
+        Asset("A", 10.0, 0.01, 0.1)
+
+def test_price_history_is_a_snapshot():
+    pool = AssetPool(history_capacity=MAX_PRICE_HISTORY, rng=np.random.default_rng(0))
+    asset = Asset("A", 1.0, 0.01, 0.1, pool=pool)
+    _grow_prices(pool, MAX_PRICE_HISTORY - 1)
+    history = asset.price_history
+    kept = history.copy()
+    
+    # The next sample wraps the buffer onto the slot holding the oldest price
+    _grow_prices(pool, 1)
+    np.testing.assert_array_equal(history, kept)
@@ -0,0 +1,53 @@
+# nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
+
+import numpy as np
+import pytest
+
+from choice_kernel import njit, choose_providers, _choose_providers_loop, _choose_providers_numpy
+
+def _segment_inputs(seed, n_consumers=2000, can_win=(True, True, False, True)):
+    """Random company factors and consumers; the third company is bankrupt and some consumers have no provider."""
+    rng = np.random.default_rng(seed)
+    n_companies = len(can_win)
+    return (
+        rng.uniform(0.5, 1.0, n_companies),                                 # price_factor
+        rng.uniform(1.0, 2.0, n_companies),                                 # ad_factor
+        np.array(can_win),
+        np.arange(n_companies, dtype=np.int16),                             # provider_ids
+        rng.uniform(0.5, 2.0, n_consumers),                                 # price_sensitivity
+        rng.uniform(0.0, 1.0, n_consumers),                                 # loyalty
+        rng.uniform(0.0, 1.0, n_consumers),                                 # satisfaction
+        rng.integers(-1, n_companies, n_consumers).astype(np.int16),        # provider
+        rng.uniform(0.95, 1.05, (n_consumers, n_companies))                 # noise
+    )
+
+def _assert_same_choices(actual, expected):
+    for actual_array, expected_array in zip(actual, expected):
+        assert actual_array.dtype == expected_array.dtype
+        np.testing.assert_array_equal(actual_array, expected_array)
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_loop_kernel_matches_numpy_kernel(seed):
+    inputs = _segment_inputs(seed)
+    _assert_same_choices(_choose_providers_loop(*inputs), _choose_providers_numpy(*inputs))
+
+def test_bankrupt_companies_win_no_consumers():
+    chosen, _, provider = _choose_providers_numpy(*_segment_inputs(0))
+    assert (chosen >= 0).all()
+    assert not (chosen == 2).any()
+    assert not (provider == 2).any()
+
+def test_consumers_keep_their_state_when_no_company_can_win():
+    inputs = _segment_inputs(0, can_win=(False, False, False, False))
+    satisfaction, provider = inputs[6], inputs[7]
+    for kernel in (_choose_providers_loop, _choose_providers_numpy):
+        chosen, new_satisfaction, new_provider = kernel(*inputs)
+        assert (chosen == -1).all()
+        np.testing.assert_array_equal(new_satisfaction, satisfaction)
+        np.testing.assert_array_equal(new_provider, provider)
+
+@pytest.mark.skipif(njit is None, reason="Numba is not installed")
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_compiled_kernel_matches_numpy_kernel(seed):
+    inputs = _segment_inputs(seed)
+    _assert_same_choices(choose_providers(*inputs), _choose_providers_numpy(*inputs))
@@ -0,0 +1,54 @@
+# nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
+
+import numpy as np
+import pytest
+
+from claims_kernel import njit, sample_claims, _sample_claims_loop, _sample_claims_numpy
+
+# Three lines: a busy auto line, a home line hit by a catastrophe, and a line without policies
+CLAIM_RATES = np.array([0.01, 0.02, 0.005])
+POLICIES = np.array([100000, 50000, 0])
+MEANS = np.array([8.7, 10.0, 9.0])
+SIGMAS = np.array([0.5, 0.7, 0.6])
+CAT_COUNTS = np.array([0, 2000, 0])
+CAT_MEANS = np.array([0.0, 11.0, 0.0])
+
+def _sample(kernel, seed):
+    return kernel(np.random.default_rng(seed), CLAIM_RATES, POLICIES, MEANS, SIGMAS, CAT_COUNTS, CAT_MEANS)
+
+def _log_segments(amounts, claim_counts):
+    """Split log claim amounts into each line's regular and catastrophe claims."""
+    ends = np.cumsum(np.column_stack((claim_counts, CAT_COUNTS)).ravel())
+    return np.split(np.log(amounts), ends[:-1])
+
+def test_loop_and_numpy_kernels_draw_the_same_claim_counts():
+    loop_amounts, loop_counts = _sample(_sample_claims_loop, seed=3)
+    numpy_amounts, numpy_counts = _sample(_sample_claims_numpy, seed=3)
+    
+    np.testing.assert_array_equal(loop_counts, numpy_counts)
+    assert loop_counts[2] == 0
+    for amounts, counts in ((loop_amounts, loop_counts), (numpy_amounts, numpy_counts)):
+        assert amounts.dtype == np.float64
+        assert len(amounts) == counts.sum() + CAT_COUNTS.sum()
+
+def test_loop_and_numpy_kernels_sample_the_same_claim_distributions():
+    loop_amounts, loop_counts = _sample(_sample_claims_loop, seed=3)
+    numpy_amounts, numpy_counts = _sample(_sample_claims_numpy, seed=3)
+    
+    # Regular then catastrophe claims per line; empty segments are skipped
+    expected = [(MEANS[0], SIGMAS[0]), (MEANS[1], SIGMAS[1]), (CAT_MEANS[1], 0.5)]
+    loop_segments = [s for s in _log_segments(loop_amounts, loop_counts) if len(s)]
+    numpy_segments = [s for s in _log_segments(numpy_amounts, numpy_counts) if len(s)]
+    assert len(loop_segments) == len(numpy_segments) == len(expected)
+    for loop_logs, numpy_logs, (mean, sigma) in zip(loop_segments, numpy_segments, expected):
+        for logs in (loop_logs, numpy_logs):
+            assert logs.mean() == pytest.approx(mean, abs=0.1)
+            assert logs.std() == pytest.approx(sigma, abs=0.05)
+
+@pytest.mark.skipif(njit is None, reason="Numba is not installed")
+def test_compiled_kernel_matches_python_loop():
+    compiled_amounts, compiled_counts = _sample(sample_claims, seed=7)
+    loop_amounts, loop_counts = _sample(_sample_claims_loop, seed=7)
+    
+    np.testing.assert_array_equal(compiled_counts, loop_counts)
+    np.testing.assert_array_equal(compiled_amounts, loop_amounts)
@@ -0,0 +1,86 @@
+# nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
+
+import numpy as np
+import pytest
+
+from data.models.claims import ClaimsLedger
+
+def _ledger_with_two_turns(capacity=1024):
+    ledger = ClaimsLedger(capacity=capacity)
+    ledger.append("CA_auto", np.array([100.0, 250.0]), turn=0)
+    ledger.append("CA_home", np.array([1000.0]), turn=0, claim_type="catastrophe")
+    ledger.append("CA_auto", np.array([50.0, 75.0, 25.0]), turn=1)
+    return ledger
+
+def test_append_returns_total_and_records_claims():
+    ledger = ClaimsLedger()
+    assert ledger.append("CA_auto", np.array([100.0, 250.0]), turn=0) == 350.0
+    assert len(ledger) == 2
+    assert ledger.line_names == ["CA_auto"]
+
+def test_append_without_claims_changes_nothing():
+    ledger = ClaimsLedger()
+    assert ledger.append("CA_auto", np.array([]), turn=0) == 0.0
+    assert len(ledger) == 0
+    assert ledger.line_names == []
+
+def test_turn_total_sums_only_that_turns_claims():
+    ledger = _ledger_with_two_turns()
+    assert ledger.turn_total(0) == 1350.0
+    assert ledger.turn_total(1) == 150.0
+    assert ledger.turn_total(2) == 0.0
+    assert ledger.turn_slice(1) == slice(3, 6)
+
+def test_growing_past_capacity_keeps_existing_claims():
+    ledger = _ledger_with_two_turns(capacity=2)
+    assert len(ledger) == 6
+    assert len(ledger.amounts) >= 6
+    assert ledger.turn_total(0) == 1350.0
+    assert [claim["type"] for claim in ledger] == ["regular", "regular", "catastrophe", "regular", "regular", "regular"]
+
+def test_reserve_preallocates_without_adding_claims():
+    ledger = ClaimsLedger(capacity=2)
+    ledger.reserve(100)
+    assert len(ledger.amounts) >= 100
+    assert len(ledger) == 0
+
+def test_to_records_matches_appended_claims():
+    records = _ledger_with_two_turns().to_records()
+    assert records[2] == {"line": "CA_home", "amount": 1000.0, "turn": 0, "type": "catastrophe"}
+    assert [record["line"] for record in records] == ["CA_auto", "CA_auto", "CA_home", "CA_auto", "CA_auto", "CA_auto"]
+
+def test_dict_round_trip_preserves_columns():
+    ledger = _ledger_with_two_turns()
+    restored = ClaimsLedger.from_dict(ledger.to_dict())
+    assert restored.to_records() == ledger.to_records()
+    
+    # Lines keep their codes, so new claims on a known line reuse it
+    restored.append("CA_home", np.array([10.0]), turn=2)
+    assert restored.line_names == ["CA_auto", "CA_home"]
+
+def test_from_dict_accepts_legacy_claim_lists():
+    claims = [
+        {"line": "FL_home", "amount": 500.0, "turn": 3, "type": "catastrophe"},
+        {"line": "FL_auto", "amount": 20.0, "turn": 3}
+    ]
+    ledger = ClaimsLedger.from_dict(claims)
+    assert ledger.turn_total(3) == pytest.approx(520.0)
+    assert [claim["type"] for claim in ledger] == ["catastrophe", "regular"]
+
+def test_from_dict_sorts_out_of_order_claims_by_turn():
+    claims = [
+        {"line": "CA_auto", "amount": 1.0, "turn": 2},
+        {"line": "CA_home", "amount": 10.0, "turn": 0},
+        {"line": "CA_auto", "amount": 100.0, "turn": 1},
+        {"line": "CA_home", "amount": 1000.0, "turn": 0, "type": "catastrophe"}
+    ]
+    for data in (claims, {"line_names": ["CA_auto", "CA_home"], "amounts": [1.0, 10.0, 100.0, 1000.0],
+                          "turns": [2, 0, 1, 0], "lines": [0, 1, 0, 1], "types": [0, 0, 0, 1]}):
+        ledger = ClaimsLedger.from_dict(data)
+        assert [ledger.turn_total(turn) for turn in range(3)] == [1010.0, 100.0, 1.0]
+        
+        # Claims of the same turn keep their saved order
+        assert ledger.to_records()[:2] == [
+            {"line": "CA_home", "amount": 10.0, "turn": 0, "type": "regular"},
+            {"line": "CA_home", "amount": 1000.0, "turn": 0, "type": "catastrophe"}
+        ]
@@ -0,0 +1,73 @@
+# nolint start: line_length_linter, trailing_whitespace_linter, indentation_linter, object_name_linter.
+
+import pytest
+
+from models import FinancialHistory, FinancialReport
+
+def _report(period, policies_by_line=None):
+    return FinancialReport(
+        period=period,
+        revenue=1000.0 * (period + 1),
+        claims_paid=400.0,
+        investment_returns=25.0,
+        unrealized_gains=-5.0,
+        operating_expenses=50.0,
+        cash=10000.0 + period,
+        investment_value=2000.0,
+        policies_by_line=policies_by_line if policies_by_line is not None else {"CA_home": 10, "CA_auto": 20}
+    )
+
+def test_history_behaves_like_a_list_of_reports():
+    history = FinancialHistory()
+    reports = [_report(period) for period in range(3)]
+    for report in reports:
+        history.append(report)
+    
+    assert len(history) == 3
+    assert history[0] == reports[0]
+    assert history[-1] == reports[-1]
+    assert history[1:] == reports[1:]
+    assert list(history) == reports
+    with pytest.raises(IndexError):
+        history[3]
+
+def test_records_expose_columns_for_vectorized_analysis():
+    history = FinancialHistory()
+    for period in range(3):
+        history.append(_report(period))
+    
+    assert history.records["revenue"].tolist() == [1000.0, 2000.0, 3000.0]
+    assert history.records["cash"].tolist() == [10000.0, 10001.0, 10002.0]
+    assert history.line_names == ("CA_home", "CA_auto")
+    assert history.policies.tolist() == [[10, 20]] * 3
+
+def test_growing_past_capacity_keeps_reports_and_policies():
+    history = FinancialHistory(capacity=1)
+    reports = [_report(period, {"CA_auto": period}) for period in range(5)]
+    for report in reports:
+        history.append(report)
+    
+    assert list(history) == reports
+    assert history.policies[:, 0].tolist() == [0, 1, 2, 3, 4]
+
+def test_new_lines_get_a_column_with_zeros_for_earlier_reports():
+    history = FinancialHistory()
+    history.append(_report(0, {"CA_auto": 5}))
+    history.append(_report(1, {"FL_home": 7, "CA_auto": 6}))
+    
+    assert history.line_names == ("CA_auto", "FL_home")
+    assert history.policies.tolist() == [[5, 0], [6, 7]]
+    assert history[0].policies_by_line == {"CA_auto": 5, "FL_home": 0}
+
+def test_report_totals():
+    report = _report(0)
+    assert report.net_income == pytest.approx(1000.0 + 25.0 - 400.0 - 50.0)
+    assert report.total_assets == pytest.approx(12000.0)
+
+def test_report_from_dict_fills_fields_missing_from_older_saves():
+    report = FinancialReport.from_dict({
+        "period": 2, "revenue": 10.0, "claims_paid": 1.0, "investment_returns": 0.0,
+        "unrealized_gains": 0.0, "operating_expenses": 5.0
+    })
+    assert (report.cash, report.investment_value, report.policies_by_line) == (0.0, 0.0, {})
+    assert FinancialReport.from_dict(report.to_dict()) == report
@@ -49,7 +49,7 @@ class ShareDialog:
             color=Colors.BLUE
         )
         
-        self.message_timer = 0
+        self.message_expires = 0  # pygame.time.get_ticks() deadline in ms
         self.message = ""
         self.message_color = Colors.BLACK
     
@@ -126,11 +126,16 @@ class ShareDialog:
             print(f"Error copying to clipboard: {e}")
             self.show_message("Error copying to clipboard", Colors.RED)
     
+    @property
+    def is_animating(self):
+        """Whether a message is showing (it must be redrawn to disappear when it expires)."""
+        return bool(self.message)
+    
     def show_message(self, message, color=Colors.BLACK):
         """Show a temporary message."""
         self.message = message
         self.message_color = color
-        self.message_timer = 120  # 2 seconds at 60 FPS
+        self.message_expires = pygame.time.get_ticks() + 2000  # 2 seconds
     
     def render(self, screen):
         """Render the share dialog."""
@@ -192,8 +197,9 @@ class ShareDialog:
             button.draw(screen)
         
         # Draw message if active
-        if self.message and self.message_timer > 0:
+        if self.message and pygame.time.get_ticks() < self.message_expires:
             message_surface = self.small_font.render(self.message, True, self.message_color)
             message_rect = message_surface.get_rect(center=(self.rect.centerx, self.rect.bottom - 100))
             screen.blit(message_surface, message_rect)
-            self.message_timer -= 1 
\ No newline at end of file
+        else:
+            self.message = "" 
\ No newline at end of file
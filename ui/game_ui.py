@@ -63,6 +63,26 @@ class GameUI:
             pygame.Rect(10, self.height - 60, self.sidebar_width - 20, 40),
             "End Turn", self.font, Colors.GREEN
         )
+        
+        # Result of the last save, load or analytics command, shown in the header for a few seconds
+        self.status_message = ""
+        self.status_message_color = Colors.WHITE
+        self.status_message_expires = 0  # pygame.time.get_ticks() deadline in ms
+    
+    @property
+    def needs_redraw(self):
+        """Whether the current screen changes without input and must be redrawn this frame."""
+        if self.in_startup:
+            return False
+        # A status message stays set until the render after its deadline erases it
+        return bool(self.status_message) or (self.current_screen == "investments"
+                                             and self.investment_screen.is_animating)
+    
+    def show_save_load_message(self, message, color=Colors.WHITE):
+        """Show a message in the header for 3 seconds."""
+        self.status_message = message
+        self.status_message_color = color
+        self.status_message_expires = pygame.time.get_ticks() + 3000
     
     def handle_event(self, event):
         """Handle UI events."""
@@ -162,6 +182,13 @@ class GameUI:
         company_text = game_state.player_company.name
         text_surface = self.font.render(company_text, True, Colors.WHITE)
         self.screen.blit(text_surface, (self.width // 2 - text_surface.get_width() // 2, 20))
+        
+        # Draw the status message until its deadline passes
+        if self.status_message and pygame.time.get_ticks() < self.status_message_expires:
+            text_surface = self.small_font.render(self.status_message, True, self.status_message_color)
+            self.screen.blit(text_surface, (self.width - text_surface.get_width() - 20, 24))
+        else:
+            self.status_message = ""
     
     def _draw_sidebar(self, game_state):
         """Draw the sidebar with actions and menus."""
@@ -1,7 +1,14 @@
 import pygame
 import math
+import numpy as np
 from ..components import Colors, Button, Panel, Slider
 
+def _chart_points(rect, values, min_value, value_range):
+    """Map a price history array to screen points spread evenly across `rect`."""
+    xs = np.linspace(rect.left, rect.right, len(values))
+    ys = rect.bottom - rect.height * (np.asarray(values) - min_value) / value_range
+    return list(zip(xs.tolist(), ys.tolist()))
+
 class InvestmentScreen:
     def __init__(self, screen_rect, font, small_font):
         self.rect = screen_rect
@@ -11,7 +18,11 @@ class InvestmentScreen:
         self.input_boxes = {}
         self.active_input = None
         self.chart_animations = {}
+        self.chart_settling = False
         self.animation_frame = 0
+        self.pulse_expires = 0  # pygame.time.get_ticks() deadline in ms
+        self.pulse_price = None
+        self.pulse_active = False
         
         # Calculate section dimensions with padding
         padding = 20
@@ -89,11 +100,29 @@ class InvestmentScreen:
         # Selected asset for detailed view
         self.selected_asset_id = None
 
+    @property
+    def is_animating(self):
+        """Whether the allocation chart is still easing or the selected asset's change is pulsing."""
+        # pulse_active keeps one more frame after the deadline so the untinted value gets drawn
+        return self.chart_settling or self.pulse_active or pygame.time.get_ticks() < self.pulse_expires
+    
+    def _select_asset(self, asset_id):
+        """Select an asset and pulse its price change for 2 seconds."""
+        self.selected_asset_id = asset_id
+        self.pulse_price = None
+    
     def render(self, screen, game_state):
         """Render the investment screen."""
         # Update animation frame
         self.animation_frame = (self.animation_frame + 1) % 60  # 60 FPS animation cycle
         
+        # Restart the pulse when the selection or its price changes
+        selected = game_state.investment_assets.get(self.selected_asset_id)
+        if selected is not None and selected.current_price != self.pulse_price:
+            self.pulse_price = selected.current_price
+            self.pulse_expires = pygame.time.get_ticks() + 2000  # 2 seconds
+        self.pulse_active = pygame.time.get_ticks() < self.pulse_expires
+        
         # Draw main panel
         self.main_panel.draw(screen)
         
@@ -343,6 +372,7 @@ class InvestmentScreen:
         portfolio_data.sort(key=lambda x: x["value"], reverse=True)
         
         # If no investments, show empty state
+        self.chart_settling = False
         if total_value == 0:
             text = self.font.render("No investments yet", True, Colors.TEXT_MUTED)
             text_rect = text.get_rect(center=(center_x, center_y))
@@ -361,6 +391,7 @@ class InvestmentScreen:
             # Smoothly animate toward target
             if abs(target - current) > 0.001:
                 self.chart_animations[asset["asset_id"]] += (target - current) * 0.2
+                self.chart_settling = True
             else:
                 self.chart_animations[asset["asset_id"]] = target
                 
@@ -478,7 +509,7 @@ class InvestmentScreen:
                 change_text = f"{price_change:+.1%}"
                 
                 # Add some animation to the change value if selected
-                if asset_id == self.selected_asset_id:
+                if asset_id == self.selected_asset_id and self.pulse_active:
                     pulse = (math.sin(self.animation_frame * 0.1) + 1) * 0.5  # Value between 0 and 1
                     color = self._interpolate_colors(color, Colors.WHITE, pulse * 0.3)
                 
@@ -532,8 +563,8 @@ class InvestmentScreen:
         )
         
         # Find min and max values for scaling
-        min_price = min(history)
-        max_price = max(history)
+        min_price = float(history.min())
+        max_price = float(history.max())
         price_range = max_price - min_price
         
         # Ensure range is at least 10% of max for better visualization
@@ -546,11 +577,7 @@ class InvestmentScreen:
         
         # Draw price line
         if len(history) > 1:
-            points = []
-            for i, price in enumerate(history):
-                x = chart_rect.left + chart_rect.width * i / (len(history) - 1)
-                y = chart_rect.bottom - chart_rect.height * (price - min_price) / price_range
-                points.append((x, y))
+            points = _chart_points(chart_rect, history, min_price, price_range)
             
             # Determine color based on price trend
             if history[-1] >= history[0]:
@@ -617,8 +644,8 @@ class InvestmentScreen:
             return
             
         # Find min and max
-        min_val = min(data)
-        max_val = max(data)
+        min_val = float(np.min(data))
+        max_val = float(np.max(data))
         val_range = max_val - min_val
         
         # Ensure range is not zero
@@ -626,11 +653,7 @@ class InvestmentScreen:
             val_range = max_val * 0.1 or 1.0
         
         # Draw the sparkline
-        points = []
-        for i, value in enumerate(data):
-            x = rect.left + rect.width * i / (len(data) - 1)
-            y = rect.bottom - rect.height * (value - min_val) / val_range
-            points.append((x, y))
+        points = _chart_points(rect, data, min_val, val_range)
         
         if len(points) > 1:
             pygame.draw.lines(screen, color, False, points, 1)
@@ -680,7 +703,7 @@ class InvestmentScreen:
                 # Create asset name clickable area
                 asset_name_rect = pygame.Rect(x, y, content_rect.width * 0.3, row_height)
                 if asset_name_rect.collidepoint(event.pos):
-                    self.selected_asset_id = asset_id
+                    self._select_asset(asset_id)
                 
                 # Check next row
                 y += row_height
@@ -700,7 +723,7 @@ class InvestmentScreen:
             for asset_id, asset in game_state.investment_assets.items():
                 card_rect = pygame.Rect(content_rect.left + 10, y, card_width, card_height)
                 if card_rect.collidepoint(event.pos):
-                    self.selected_asset_id = asset_id
+                    self._select_asset(asset_id)
                 
                 y += card_height + card_spacing
                 
@@ -76,8 +76,7 @@ class PremiumScreen:
         row_height = 70
         
         for line_id, segment in game_state.market_segments.items():
-            state_id = line_id.split("_")[0]
-            if not game_state.unlocked_states[state_id]:
+            if not game_state.unlocked_states[game_state.line_to_state[line_id]]:
                 continue
             
             # Get rates
@@ -145,7 +145,7 @@ class ReportsScreen:
         
         # Calculate total market size and prepare company data
         total_market_size = sum(segment.market_size for segment in game_state.market_segments.values())
-        companies = [game_state.player_company] + game_state.ai_competitors
+        companies = game_state.companies
         
         for company in companies:
             # Calculate market share
@@ -60,7 +60,7 @@ class SaveLoadScreen:
         
         self.message = ""
         self.message_color = Colors.BLACK
-        self.message_timer = 0
+        self.message_expires = 0  # pygame.time.get_ticks() deadline in ms
     
     def handle_event(self, event: pygame.event.Event) -> Optional[str]:
         """Handle events related to save/load screen."""
@@ -149,10 +149,11 @@ class SaveLoadScreen:
                 screen.blit(save_date, (slot["button"].rect.right + 10, slot["button"].rect.top + 5))
         
         # Draw message if any
-        if self.message and self.message_timer > 0:
+        if self.message and pygame.time.get_ticks() < self.message_expires:
             message_surface = self.main_font.render(self.message, True, self.message_color)
             screen.blit(message_surface, (self.rect.centerx - message_surface.get_width()//2, self.rect.bottom - 30))
-            self.message_timer -= 1
+        else:
+            self.message = ""
     
     def _refresh_save_slots(self) -> None:
         """Refresh the list of available save files."""
@@ -197,8 +198,13 @@ class SaveLoadScreen:
                 "button": Button(button_rect, display_name, self.main_font)
             })
     
+    @property
+    def is_animating(self) -> bool:
+        """Whether a message is showing (it must be redrawn to disappear when it expires)."""
+        return bool(self.message)
+    
     def show_message(self, message: str, color: Tuple[int, int, int] = Colors.BLACK) -> None:
         """Show a temporary message on the screen."""
         self.message = message
         self.message_color = color
-        self.message_timer = 120  # frames 
\ No newline at end of file
+        self.message_expires = pygame.time.get_ticks() + 2000  # 2 seconds 
\ No newline at end of file
@@ -2,6 +2,7 @@
 
 import os
 import json
+import asyncio
 from typing import Dict, Any, List, Union, Optional
 import numpy as np
 import pygame
@@ -10,6 +11,9 @@ import platform
 # Detect if we're running in a browser environment (Pygbag)
 IS_BROWSER = platform.system() == 'Emscripten'
 
+# Generator behind the random helpers (PCG64 rather than the legacy global RandomState)
+_rng = np.random.default_rng()
+
 def format_currency(value: float) -> str:
     """Format a value as currency with dollar sign."""
     return f"${value:,.2f}"
@@ -32,11 +36,11 @@ def calculate_combined_ratio(claims: float, expenses: float, premiums: float) ->
 
 def log_normal_random(mean: float, sigma: float, size: int = 1) -> Union[float, np.ndarray]:
     """Generate random values from a log-normal distribution."""
-    return np.random.lognormal(mean=mean, sigma=sigma, size=size)
+    return _rng.lognormal(mean=mean, sigma=sigma, size=size)
 
 def poisson_random(lam: float, size: int = 1) -> Union[int, np.ndarray]:
     """Generate random values from a Poisson distribution."""
-    return np.random.poisson(lam=lam, size=size)
+    return _rng.poisson(lam=lam, size=size)
 
 def render_text(screen: pygame.Surface, text: str, font: pygame.font.Font, 
                 position: tuple, color: tuple, centered: bool = False) -> None:
@@ -48,30 +52,59 @@ def render_text(screen: pygame.Surface, text: str, font: pygame.font.Font,
     else:
         screen.blit(text_surface, position)
 
+def serialize_game_state(game_state: Any) -> Optional[str]:
+    """Serialize the game state to JSON (indented on desktop so save files stay readable)."""
+    try:
+        return json.dumps(game_state.to_dict(), indent=None if IS_BROWSER else 2)
+    except Exception as e:
+        print(f"Error saving game: {e}")
+        return None
+
+def _write_save(json_str: str, filename: str) -> None:
+    """Write a serialized game state to a file or browser localStorage."""
+    if IS_BROWSER:
+        # In browser, use localStorage
+        import javascript
+        from javascript import localStorage
+        
+        localStorage.setItem(filename, json_str)
+        print(f"Game saved to browser localStorage: {filename}")
+    else:
+        # On desktop, save to file
+        # Create saves directory if it doesn't exist
+        os.makedirs('saves', exist_ok=True)
+        
+        # Save to file
+        save_path = os.path.join('saves', filename)
+        with open(save_path, 'w') as f:
+            f.write(json_str)
+
 def save_game_state(game_state: Any, filename: str) -> bool:
     """Save the game state to a file or browser localStorage."""
+    json_str = serialize_game_state(game_state)
+    if json_str is None:
+        return False
+    try:
+        _write_save(json_str, filename)
+        return True
+    except Exception as e:
+        print(f"Error saving game: {e}")
+        return False
+
+async def write_save_async(json_str: str, filename: str) -> bool:
+    """
+    Write a save produced by serialize_game_state without stalling the frame loop.
+    
+    Callers serialize first, so the save is a snapshot of the state at that moment even
+    if the game moves on before the write finishes. On desktop the write runs in a worker
+    thread; in the browser (no threads) a frame is let through before it.
+    """
     try:
-        # Convert game_state to a serializable dictionary
-        state_dict = game_state.to_dict()
-        
         if IS_BROWSER:
-            # In browser, use localStorage
-            import javascript
-            from javascript import localStorage
-            
-            # Stringify the JSON and store it
-            json_str = json.dumps(state_dict)
-            localStorage.setItem(filename, json_str)
-            print(f"Game saved to browser localStorage: {filename}")
+            await asyncio.sleep(0)
+            _write_save(json_str, filename)
         else:
-            # On desktop, save to file
-            # Create saves directory if it doesn't exist
-            os.makedirs('saves', exist_ok=True)
-            
-            # Save to file
-            save_path = os.path.join('saves', filename)
-            with open(save_path, 'w') as f:
-                json.dump(state_dict, f, indent=2)
+            await asyncio.get_running_loop().run_in_executor(None, _write_save, json_str, filename)
         return True
     except Exception as e:
         print(f"Error saving game: {e}")